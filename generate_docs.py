@@ -4,15 +4,66 @@ Generate llms.txt and llms-full.txt from any markdown documentation repository.
 Agnostic script that works with any GitHub repo containing markdown files.
 """
 
+import codecs
+import gzip
+import io
+import mmap
 import os
 import sys
 import subprocess
 import json
 import re
-from pathlib import Path
+import shutil
+import hashlib
+import tempfile
+import time
+import threading
+from pathlib import Path, PurePosixPath
 import argparse
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack, contextmanager
+from itertools import chain, islice
 from urllib.parse import urlparse
 
+try:
+    import yaml
+except ImportError:
+    yaml = None
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+_locks = {}
+_locks_guard = threading.Lock()
+_remote_heads = {}
+
+TRASH_PREFIX = ".llms-trash-"
+# Marks a --work-dir as created by this tool, so a later run may clear it
+WORK_DIR_MARKER = ".llms-work-dir"
+
+# Folders that never contain documentation and are not descended into
+EXCLUDED_DIRS = frozenset(['.github', 'node_modules', '.git'])
+DEFAULT_INCLUDE = ("*.md",)
+IGNORE_FILES = ('.gitignore', '.llmsignore')
+
 
 def run_command(cmd, cwd=None, capture_output=True):
     """Run a shell command and return the result."""
@@ -24,269 +75,2531 @@ def run_command(cmd, cwd=None, capture_output=True):
             text=True,
             check=True
         )
-        return result.stdout.strip() if capture_output else ""
-    except subprocess.CalledProcessError as e:
-        return None
+        return result.stdout.strip() if capture_output else ""
+    except subprocess.CalledProcessError as e:
+        return None
+
+
+def extract_repo_info(repo_url):
+    """Extract owner and repo name from GitHub URL."""
+    # Handle both git and https URLs
+    patterns = [
+        r'github\.com[:/]([^/]+)/([^/.]+)',
+        r'([^/]+)/([^/.]+?)(?:\.git)?$'
+    ]
+    
+    for pattern in patterns:
+        match = re.search(pattern, repo_url)
+        if match:
+            owner = match.group(1)
+            repo = match.group(2).replace('.git', '')
+            return owner, repo
+    
+    return None, None
+
+
+def github_cache_file(cache_dir, owner, repo):
+    """Return the on-disk metadata cache file of a GitHub repository."""
+    return Path(cache_dir) / "github" / f"{owner}__{repo}.json".lower()
+
+
+def load_github_cache(cache_file):
+    """Return the cached metadata entry, or None if there is no usable entry."""
+    try:
+        with open(cache_file, 'r', encoding='utf-8') as f:
+            entry = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return entry if isinstance(entry.get('data'), dict) else None
+
+
+def save_github_cache(cache_file, entry):
+    """Atomically write a metadata entry to the cache."""
+    cache_file.parent.mkdir(parents=True, exist_ok=True)
+    tmp_file = f"{cache_file}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        json.dump(entry, f)
+    os.replace(tmp_file, cache_file)
+
+
+def fetch_github_about(owner, repo, cache_dir=None, ttl=86400, token=None, offline=False):
+    """Fetch the About/Description from GitHub repository.
+    
+    With cache_dir, responses are cached on disk for ttl seconds and then
+    revalidated with If-None-Match, which does not count against the rate limit
+    when nothing changed. offline=True only serves the cache.
+    """
+    default = {'homepage': None, 'description': None, 'name': repo}
+    cache_file = github_cache_file(cache_dir, owner, repo) if cache_dir else None
+    cached = load_github_cache(cache_file) if cache_file else None
+    
+    if cached and (offline or time.time() - cached.get('fetched_at', 0) < ttl):
+        return dict(cached['data'])
+    if offline:
+        print(f"  ⚠ No cached GitHub metadata for {owner}/{repo} (offline)")
+        return default
+    
+    try:
+        import urllib.request
+        import urllib.error
+        api_url = f"https://api.github.com/repos/{owner}/{repo}"
+        
+        req = urllib.request.Request(api_url)
+        req.add_header('User-Agent', 'llms-txt-generator')
+        if token:
+            req.add_header('Authorization', f"Bearer {token}")
+        if cached and cached.get('etag'):
+            req.add_header('If-None-Match', cached['etag'])
+        
+        try:
+            with urllib.request.urlopen(req, timeout=10) as response:
+                data = json.loads(response.read().decode())
+                etag = response.headers.get('ETag')
+        except urllib.error.HTTPError as e:
+            if e.code == 304 and cached:
+                # Not modified: keep the cached data and restart its TTL
+                cached['fetched_at'] = time.time()
+                save_github_cache(cache_file, cached)
+                return dict(cached['data'])
+            raise
+        
+        homepage = (data.get('homepage') or '').strip()
+        description = (data.get('description') or '').strip()
+        
+        info = {
+            'homepage': homepage if homepage else None,
+            'description': description if description else None,
+            'name': data.get('name', repo)
+        }
+        if cache_file:
+            save_github_cache(cache_file, {'etag': etag, 'fetched_at': time.time(), 'data': info})
+        return info
+    except Exception as e:
+        print(f"  ⚠ Could not fetch GitHub metadata: {e}")
+        if cached:
+            print(f"  Using cached GitHub metadata")
+            return dict(cached['data'])
+        return default
+
+
+def keyed_lock(key):
+    """Return the process-wide lock dedicated to key."""
+    with _locks_guard:
+        return _locks.setdefault(key, threading.Lock())
+
+
+def get_github_about(owner, repo, metadata_cache=None, **options):
+    """Return GitHub metadata, fetching it at most once per repository when a cache is shared.
+    
+    options are passed on to fetch_github_about.
+    """
+    if metadata_cache is None:
+        return fetch_github_about(owner, repo, **options)
+    
+    with keyed_lock(('github', owner, repo)):
+        if (owner, repo) not in metadata_cache:
+            metadata_cache[(owner, repo)] = fetch_github_about(owner, repo, **options)
+        return dict(metadata_cache[(owner, repo)])
+
+
+def delete_in_background(path):
+    """Delete a directory tree without waiting for it, even past the end of this process."""
+    if os.name == 'posix':
+        subprocess.Popen(
+            ["rm", "-rf", str(path)],
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            start_new_session=True
+        )
+    else:
+        threading.Thread(target=shutil.rmtree, args=(str(path), True), daemon=True).start()
+
+
+def remove_tree(path):
+    """Remove a directory tree without blocking on the deletion.
+    
+    The tree is atomically renamed to a trash name next to it, so path is free
+    immediately, and then deleted in the background. Trash left behind by an
+    interrupted run is picked up by sweep_trash.
+    """
+    path = Path(path)
+    if not path.exists():
+        return
+    trash = path.parent / f"{TRASH_PREFIX}{path.name}-{os.getpid()}-{threading.get_ident()}-{time.time_ns()}"
+    try:
+        os.rename(path, trash)
+    except OSError:
+        shutil.rmtree(path, ignore_errors=True)
+        return
+    delete_in_background(trash)
+
+
+def sweep_trash(directory):
+    """Delete, in the background, trash that earlier runs left in directory."""
+    try:
+        leftovers = list(Path(directory).glob(f"{TRASH_PREFIX}*"))
+    except OSError:
+        return
+    for trash in leftovers:
+        delete_in_background(trash)
+
+
+@contextmanager
+def file_lock(lock_path, blocking=True, shared=False):
+    """Hold an exclusive (or shared) lock on lock_path, seen by every process on this host.
+    
+    Yields whether the lock was acquired, which is always True when blocking.
+    Where fcntl is unavailable no inter-process lock is taken.
+    """
+    if fcntl is None:
+        yield True
+        return
+    with open(lock_path, 'a') as f:
+        try:
+            mode = fcntl.LOCK_SH if shared else fcntl.LOCK_EX
+            fcntl.flock(f, mode | (0 if blocking else fcntl.LOCK_NB))
+            acquired = True
+        except BlockingIOError:
+            acquired = False
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+
+@contextmanager
+def mirror_lock(mirror_dir, blocking=True):
+    """Serialize use of a mirror across threads and processes. Yields whether it was acquired."""
+    lock = keyed_lock(('mirror', str(mirror_dir)))
+    if not lock.acquire(blocking):
+        yield False
+        return
+    try:
+        Path(mirror_dir).parent.mkdir(parents=True, exist_ok=True)
+        with file_lock(f"{mirror_dir}.lock", blocking) as acquired:
+            yield acquired
+    finally:
+        lock.release()
+
+
+@contextmanager
+def mirror_in_use(mirror_dir):
+    """Mark a mirror as in use for the whole of a job, so evict_mirrors leaves it alone.
+    
+    Any number of jobs can hold this at once; it does not serialize fetches, which
+    still need mirror_lock.
+    """
+    Path(mirror_dir).parent.mkdir(parents=True, exist_ok=True)
+    with file_lock(f"{mirror_dir}.use", shared=True):
+        yield
+
+
+def check_work_dir(path):
+    """Return an error message if path cannot be used as --work-dir, else None.
+    
+    The directory is cleared before and after every run, so only a missing or empty
+    directory, or one an earlier run created, is accepted.
+    """
+    path = Path(path)
+    if not path.exists():
+        return None
+    if not path.is_dir():
+        return f"--work-dir {path} is not a directory"
+    if (path / WORK_DIR_MARKER).exists() or not any(path.iterdir()):
+        return None
+    return f"--work-dir {path} is not empty and was not created by this tool"
+
+
+@contextmanager
+def work_directory(args, prefix, path=None):
+    """Provide the directory a job checks repositories out into.
+    
+    Unless a path or --work-dir is given, every run gets its own unique temporary
+    directory, so concurrent runs on one host never collide. --work-dir is locked
+    for the duration of the run and must pass check_work_dir. The directory is
+    removed afterwards unless --keep-repo is set; a --work-dir that already
+    existed is left behind empty.
+    """
+    with ExitStack() as stack:
+        existed = False
+        if path is None and args.work_dir:
+            path = Path(args.work_dir).resolve()
+            path.parent.mkdir(parents=True, exist_ok=True)
+            if not stack.enter_context(file_lock(f"{path}.lock", blocking=False)):
+                print(f"Waiting for another run to release {path}...")
+                stack.enter_context(file_lock(f"{path}.lock"))
+            # A directory the user made is emptied afterwards rather than removed
+            existed = path.exists() and not (path / WORK_DIR_MARKER).exists()
+        
+        if path is None:
+            work_dir = Path(tempfile.mkdtemp(prefix=prefix))
+        else:
+            work_dir = Path(path)
+            # Clean up what an earlier run left behind
+            if work_dir.exists():
+                print(f"Removing existing directory: {work_dir}")
+                remove_tree(work_dir)
+            work_dir.mkdir(parents=True)
+            (work_dir / WORK_DIR_MARKER).touch()
+        
+        try:
+            yield work_dir
+        finally:
+            if args.keep_repo:
+                print(f"\nRepository kept in {work_dir}")
+            else:
+                print(f"\nCleaning up: removing {work_dir}")
+                remove_tree(work_dir)
+                if existed:
+                    work_dir.mkdir()
+
+
+def default_cache_dir():
+    """Return the default directory for persistent repository mirrors."""
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'llms-txt-generator')
+
+
+def get_mirror_dir(cache_dir, repo_url):
+    """Return the content-addressed mirror directory for a repository URL."""
+    key = hashlib.sha256(repo_url.strip().rstrip('/').encode('utf-8')).hexdigest()[:16]
+    return Path(cache_dir) / "mirrors" / f"{key}.git"
+
+
+def get_dir_size(path):
+    """Return the total size in bytes of all files below path."""
+    total = 0
+    for dirpath, _, filenames in os.walk(path):
+        for filename in filenames:
+            try:
+                total += os.lstat(os.path.join(dirpath, filename)).st_size
+            except OSError:
+                continue
+    return total
+
+
+def touch_mirror(mirror_dir):
+    """Record that a mirror was just used, for LRU eviction."""
+    (Path(mirror_dir) / "llms-last-used").touch()
+
+
+def evict_mirrors(cache_dir, max_size_mb, keep=None):
+    """Delete least recently used mirrors until the cache fits in max_size_mb."""
+    mirrors_dir = Path(cache_dir) / "mirrors"
+    if not max_size_mb or not mirrors_dir.exists():
+        return
+    
+    sweep_trash(mirrors_dir)
+    mirrors = []
+    for mirror_dir in mirrors_dir.iterdir():
+        if not mirror_dir.is_dir() or mirror_dir.name.startswith(TRASH_PREFIX):
+            continue
+        stamp = mirror_dir / "llms-last-used"
+        last_used = stamp.stat().st_mtime if stamp.exists() else mirror_dir.stat().st_mtime
+        mirrors.append((last_used, mirror_dir, get_dir_size(mirror_dir)))
+    
+    total = sum(size for _, _, size in mirrors)
+    limit = max_size_mb * 1024 * 1024
+    for _, mirror_dir, size in sorted(mirrors, key=lambda m: m[0]):
+        if total <= limit:
+            break
+        if keep and Path(keep) == mirror_dir:
+            continue
+        # Mirrors being fetched or used by another job or process are skipped
+        with mirror_lock(mirror_dir, blocking=False) as acquired:
+            if not acquired:
+                continue
+            with file_lock(f"{mirror_dir}.use", blocking=False) as unused:
+                if not unused:
+                    continue
+                print(f"  Evicting cached mirror: {mirror_dir.name}")
+                remove_tree(mirror_dir)
+        total -= size
+
+
+def init_mirror(repo_url, mirror_dir):
+    """Create the bare mirror for repo_url if it does not exist yet. Returns True on success."""
+    if (Path(mirror_dir) / "HEAD").exists():
+        return True
+    Path(mirror_dir).mkdir(parents=True, exist_ok=True)
+    if run_command(["git", "init", "--bare", "--quiet", str(mirror_dir)]) is None:
+        return False
+    return run_command(["git", "-C", str(mirror_dir), "remote", "add", "origin", repo_url]) is not None
+
+
+def enable_partial_clone(mirror_dir):
+    """Turn a mirror into a blobless partial clone so blobs are only fetched on demand."""
+    mirror = str(mirror_dir)
+    for key, value in (
+        ("core.repositoryformatversion", "1"),
+        ("extensions.partialClone", "origin"),
+        ("remote.origin.promisor", "true"),
+        ("remote.origin.partialclonefilter", "blob:none"),
+    ):
+        if run_command(["git", "-C", mirror, "config", key, value]) is None:
+            return False
+    return True
+
+
+def fetch_into_mirror(repo_url, mirror_dir, ref, blobless=False):
+    """Create or update a bare mirror, fetching only the requested ref.
+    
+    ref is a full ref name (refs/heads/NAME or refs/tags/NAME, see resolve_branch)
+    and is stored under the same name in the mirror. With blobless=True only
+    commits and trees are transferred; blobs are fetched later, on demand.
+    Returns the local ref that holds the fetched commit, or None on failure.
+    """
+    mirror = str(mirror_dir)
+    if not init_mirror(repo_url, mirror_dir):
+        return None
+    if blobless and not enable_partial_clone(mirror_dir):
+        return None
+    
+    cmd = ["git", "-C", mirror, "fetch", "--depth", "1", "--no-tags", "--quiet"]
+    if blobless:
+        cmd.append("--filter=blob:none")
+    if run_command(cmd + ["origin", f"+{ref}:{ref}"]) is None:
+        return None
+    return ref
+
+
+def fetch_branches(repo_url, mirror_dir, branches, blobless=False):
+    """Fetch several branches (or tags) into a mirror with a single fetch.
+    
+    Returns a dict mapping each branch that could be fetched to its local ref.
+    """
+    if not init_mirror(repo_url, mirror_dir):
+        return {}
+    if blobless and not enable_partial_clone(mirror_dir):
+        return {}
+    
+    # Only ask for refs the remote has, so one missing branch does not fail the fetch
+    heads = list_remote_heads(repo_url)
+    if heads is None:
+        return {}
+    remote_branches, remote_tags, _ = heads
+    refs = {}
+    for branch in branches:
+        if branch in remote_branches:
+            refs[branch] = f"refs/heads/{branch}"
+        elif branch in remote_tags:
+            refs[branch] = f"refs/tags/{branch}"
+    if not refs:
+        return {}
+    
+    refspecs = [f"+{ref}:{ref}" for ref in refs.values()]
+    cmd = ["git", "-C", str(mirror_dir), "fetch", "--depth", "1", "--no-tags", "--quiet"]
+    if blobless:
+        cmd.append("--filter=blob:none")
+    if run_command(cmd + ["origin"] + refspecs) is None:
+        return {}
+    return refs
+
+
+def sparse_checkout_args(root_folder=".", markdown_only=False):
+    """Return the `git sparse-checkout set` arguments restricting a checkout to root_folder.
+    
+    Returns None when the whole tree would be checked out anyway.
+    """
+    root = root_folder.strip('/')
+    if root == '.':
+        root = ''
+    if markdown_only:
+        prefix = f"/{root}" if root else ""
+        patterns = [f"{prefix}/**/*.md"] + [f"{prefix}/**/{name}" for name in IGNORE_FILES]
+        # Ignore files of the folders above the root apply as well
+        base = ""
+        for part in PurePosixPath(root).parts:
+            patterns += [f"{base}/{name}" for name in IGNORE_FILES]
+            base += f"/{part}"
+        return ["--no-cone"] + patterns
+    if not root:
+        return None
+    return ["--cone", root]
+
+
+def apply_sparse_checkout(repo_dir, sparse_args):
+    """Populate a --no-checkout working tree with only the paths selected by sparse_args."""
+    if run_command(["git", "-C", str(repo_dir), "sparse-checkout", "set"] + sparse_args) is None:
+        return False
+    return run_command(["git", "-C", str(repo_dir), "read-tree", "-mu", "HEAD"]) is not None
+
+
+def add_worktree(mirror_dir, target_dir, ref, sparse_args=None):
+    """Check ref out of mirror_dir as a detached worktree, optionally sparse."""
+    cmd = ["git", "-C", str(mirror_dir), "worktree", "add", "--detach", "--force"]
+    if sparse_args:
+        cmd.append("--no-checkout")
+    if run_command(cmd + [str(target_dir), ref]) is None:
+        return False
+    return not sparse_args or apply_sparse_checkout(target_dir, sparse_args)
+
+
+def checkout_from_mirror(repo_url, target_dir, branch, cache_dir, sparse_args=None):
+    """Update the cached mirror for repo_url and check branch out into target_dir."""
+    mirror_dir = get_mirror_dir(cache_dir, repo_url)
+    print(f"Using cached mirror: {mirror_dir}")
+    
+    # Jobs sharing a mirror must not fetch into it at the same time
+    with mirror_lock(mirror_dir):
+        return _checkout_from_mirror(repo_url, mirror_dir, target_dir, branch, sparse_args)
+
+
+def list_remote_heads(repo_url):
+    """Return (branches, tags, default_branch) of a remote with a single `git ls-remote`.
+    
+    Results are cached per repository for the lifetime of the process. Returns
+    None if the remote cannot be reached.
+    """
+    with keyed_lock(('ls-remote', repo_url)):
+        if repo_url not in _remote_heads:
+            output = run_command(
+                ["git", "ls-remote", "--symref", repo_url, "HEAD", "refs/heads/*", "refs/tags/*"]
+            )
+            if output is None:
+                return None
+            branches = set()
+            tags = set()
+            default_branch = None
+            for line in output.splitlines():
+                if line.startswith("ref: refs/heads/") and line.endswith("\tHEAD"):
+                    default_branch = line[len("ref: refs/heads/"):-len("\tHEAD")]
+                    continue
+                _, _, ref = line.partition('\t')
+                if ref.startswith("refs/heads/"):
+                    branches.add(ref[len("refs/heads/"):])
+                elif ref.startswith("refs/tags/"):
+                    # Annotated tags are listed a second time, peeled, as refs/tags/NAME^{}
+                    tags.add(ref[len("refs/tags/"):].replace("^{}", ""))
+            _remote_heads[repo_url] = (branches, tags, default_branch)
+        return _remote_heads[repo_url]
+
+
+def resolve_branch(repo_url, branch=None):
+    """Pick the ref to fetch: branch (or a tag of that name), else master, else the default branch.
+    
+    branch defaults to main, and only the default falls back: a branch or tag
+    given explicitly must exist. Returns the full ref name (refs/heads/NAME or
+    refs/tags/NAME), or None if the remote cannot be reached or has no such ref.
+    """
+    heads = list_remote_heads(repo_url)
+    if heads is None:
+        return None
+    branches, tags, default_branch = heads
+    name = branch or "main"
+    if name in branches:
+        return f"refs/heads/{name}"
+    if name in tags:
+        return f"refs/tags/{name}"
+    if branch is not None:
+        print(f"  ✗ Branch or tag '{branch}' not found")
+        return None
+    
+    # If main doesn't exist, try master
+    if "master" in branches:
+        print(f"  ⚠ Branch '{name}' not found, using 'master'")
+        return "refs/heads/master"
+    
+    # If still not found, use the default branch
+    if default_branch:
+        print(f"  ⚠ Branch '{name}' not found, using default branch '{default_branch}'")
+        return f"refs/heads/{default_branch}"
+    return None
+
+
+def short_ref_name(ref):
+    """Return the branch or tag name of a full ref name such as refs/tags/v1.0."""
+    return ref.split('/', 2)[2]
+
+
+def fetch_ref(repo_url, mirror_dir, branch=None, blobless=False):
+    """Fetch branch (or tag) into mirror_dir; see resolve_branch for the fallbacks.
+    
+    The branch is resolved with one ls-remote first, so exactly one fetch is made.
+    Returns the local ref that was fetched, or None if nothing could be fetched.
+    """
+    resolved = resolve_branch(repo_url, branch)
+    if resolved is None:
+        return None
+    return fetch_into_mirror(repo_url, mirror_dir, resolved, blobless)
+
+
+def _checkout_from_mirror(repo_url, mirror_dir, target_dir, branch, sparse_args=None):
+    """Fetch branch into mirror_dir and add a worktree for it; the caller holds the mirror lock."""
+    # A sparse worktree only needs the blobs it checks out, so skip the others when fetching
+    ref = fetch_ref(repo_url, mirror_dir, branch, blobless=bool(sparse_args))
+    if ref is None:
+        return False
+    
+    # Drop registrations of worktrees whose directories were removed by earlier runs
+    run_command(["git", "-C", str(mirror_dir), "worktree", "prune"])
+    if not add_worktree(mirror_dir, target_dir, ref, sparse_args):
+        return False
+    
+    touch_mirror(mirror_dir)
+    return True
+
+
+def clone_repo(repo_url, target_dir, branch=None, cache_dir=None, sparse_args=None):
+    """Clone the GitHub repository, through the persistent mirror cache when cache_dir is set.
+    
+    branch may also name a tag; None stands for main with its fallbacks (see
+    resolve_branch). sparse_args (see sparse_checkout_args) turns the clone into
+    a blobless partial clone with only the selected paths checked out.
+    """
+    print(f"Cloning repository from {repo_url}...")
+    print(f"Branch: {branch or 'main'}")
+    
+    if cache_dir:
+        if not checkout_from_mirror(repo_url, target_dir, branch, cache_dir, sparse_args):
+            print(f"✗ Failed to clone repository")
+            return False
+        print(f"✓ Repository checked out to {target_dir}")
+        return True
+    
+    clone_cmd = ["git", "clone", "--depth", "1"]
+    if sparse_args:
+        clone_cmd += ["--filter=blob:none", "--no-checkout"]
+    
+    # Resolve the branch first so that exactly one clone is made
+    resolved = resolve_branch(repo_url, branch)
+    if resolved is None or run_command(
+        clone_cmd + ["--branch", short_ref_name(resolved), repo_url, target_dir]
+    ) is None:
+        print(f"✗ Failed to clone repository")
+        return False
+    
+    if sparse_args and not apply_sparse_checkout(target_dir, sparse_args):
+        print(f"✗ Failed to check out {' '.join(sparse_args[1:])}")
+        return False
+    
+    print(f"✓ Repository cloned to {target_dir}")
+    return True
+
+
+def job_sparse_args(args):
+    """Return the sparse-checkout arguments requested by a job's options, or None."""
+    if not (args.sparse or args.sparse_markdown):
+        return None
+    return sparse_checkout_args(args.root, args.sparse_markdown)
+
+
+def compile_glob(pattern):
+    """Compile a glob into a regex matching '/'-separated paths relative to the docs root.
+    
+    '**' matches across directories while '*' and '?' stay within one path
+    component. A pattern without '/' matches a file or directory name at any depth.
+    """
+    anchored = '/' in pattern.rstrip('/')
+    pattern = pattern.lstrip('/')
+    regex = ''
+    i = 0
+    while i < len(pattern):
+        if pattern.startswith('**/', i):
+            regex += '(?:.*/)?'
+            i += 3
+        elif pattern.startswith('**', i):
+            regex += '.*'
+            i += 2
+        elif pattern[i] == '*':
+            regex += '[^/]*'
+            i += 1
+        elif pattern[i] == '?':
+            regex += '[^/]'
+            i += 1
+        elif pattern[i] == '[' and ']' in pattern[i + 2:]:
+            end = pattern.index(']', i + 2)
+            body = pattern[i + 1:end]
+            if body.startswith('!'):
+                body = '^' + body[1:]
+            regex += f"[{body.replace(chr(92), chr(92) * 2)}]"
+            i = end + 1
+        else:
+            regex += re.escape(pattern[i])
+            i += 1
+    if not anchored:
+        regex = '(?:.*/)?' + regex
+    return re.compile(regex + '$')
+
+
+def make_path_matcher(patterns):
+    """Return a function telling whether a relative path matches any of the glob patterns."""
+    regexes = [compile_glob(pattern) for pattern in patterns or ()]
+    
+    def matches(rel_path):
+        return any(regex.match(rel_path) for regex in regexes)
+    
+    return matches
+
+
+def compile_ignore_pattern(line):
+    """Compile one .gitignore line into (regex, negated), or None for blanks and comments."""
+    line = line.rstrip('\r\n')
+    if not line.strip() or line.startswith('#'):
+        return None
+    
+    # Trailing spaces are ignored unless escaped
+    stripped = line.rstrip(' ')
+    if stripped.endswith('\\') and len(stripped) < len(line):
+        stripped = stripped[:-1] + ' '
+    line = stripped
+    
+    negated = line.startswith('!')
+    if negated:
+        line = line[1:]
+    elif line.startswith(('\\#', '\\!')):
+        line = line[1:]
+    return compile_glob(line), negated
+
+
+class IgnoreRules:
+    """Compiled .gitignore/.llmsignore rules, evaluated with the last matching rule winning."""
+    
+    def __init__(self, rules=()):
+        self.rules = tuple(rules)
+    
+    def extend(self, base, lines):
+        """Return these rules followed by those of an ignore file in directory base ('' or 'dir/')."""
+        compiled = [(base,) + pattern for pattern in map(compile_ignore_pattern, lines) if pattern]
+        return IgnoreRules(self.rules + tuple(compiled)) if compiled else self
+    
+    def ignored(self, rel_path, is_dir=False):
+        """Tell whether a repository-relative path is matched by an ignore rule."""
+        for base, regex, negated in reversed(self.rules):
+            if not rel_path.startswith(base):
+                continue
+            sub_path = rel_path[len(base):]
+            if regex.match(sub_path) or (is_dir and regex.match(sub_path + '/')):
+                return not negated
+        return False
+    
+    def excludes(self, rel_path):
+        """Tell whether a file is ignored, itself or through one of its parent directories."""
+        parts = rel_path.split('/')
+        for depth in range(1, len(parts)):
+            if self.ignored('/'.join(parts[:depth]), is_dir=True):
+                return True
+        return self.ignored(rel_path)
+
+
+def read_ignore_file(path):
+    """Return the lines of an ignore file, or no lines if it cannot be read."""
+    try:
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
+            return f.read().splitlines()
+    except OSError:
+        return []
+
+
+def iter_markdown_files(docs_path, include=None, exclude=None, ignore_rules=None, ignore_prefix=''):
+    """Yield the markdown files below docs_path, in sorted order, as they are discovered.
+    
+    Excluded directories (the common non-documentation folders, anything matching
+    an exclude glob and, when ignore_rules is given, anything ignored by a
+    .gitignore or .llmsignore) are pruned before they are descended into.
+    ignore_prefix is the path of docs_path relative to the repository root.
+    """
+    include_match = make_path_matcher(include or DEFAULT_INCLUDE)
+    exclude_match = make_path_matcher(exclude)
+    
+    def walk(directory, rel_dir, rules):
+        try:
+            with os.scandir(directory) as it:
+                entries = sorted(it, key=lambda entry: entry.name)
+        except OSError:
+            return
+        if rules is not None:
+            for entry in entries:
+                if entry.name in IGNORE_FILES:
+                    rules = rules.extend(ignore_prefix + rel_dir, read_ignore_file(entry.path))
+        
+        for entry in entries:
+            rel_path = rel_dir + entry.name
+            is_dir = entry.is_dir(follow_symlinks=False)
+            if rules is not None and rules.ignored(ignore_prefix + rel_path, is_dir):
+                continue
+            if is_dir:
+                # Skip common non-documentation folders without descending into them
+                if entry.name in EXCLUDED_DIRS or exclude_match(rel_path) or exclude_match(rel_path + '/'):
+                    continue
+                yield from walk(entry.path, rel_path + '/', rules)
+            elif include_match(rel_path) and not exclude_match(rel_path):
+                yield Path(entry.path)
+    
+    yield from walk(docs_path, '', ignore_rules)
+
+
+def collect_markdown_files(docs_dir, root_folder=".", include=None, exclude=None, ignore_files=False):
+    """Collect all markdown files from the specified directory.
+    
+    With ignore_files, .gitignore and .llmsignore files of docs_dir and of every
+    folder down to the files are honoured.
+    """
+    docs_path = Path(docs_dir) / root_folder
+    
+    if not docs_path.exists():
+        print(f"✗ Directory not found: {docs_path}")
+        return [], docs_path
+    
+    ignore_rules = None
+    ignore_prefix = ''
+    if ignore_files:
+        # Rules of the folders above the docs root apply too
+        ignore_rules = IgnoreRules()
+        rel_root = docs_path.relative_to(docs_dir).parts
+        for depth in range(len(rel_root)):
+            base = ''.join(f"{part}/" for part in rel_root[:depth])
+            for name in IGNORE_FILES:
+                ignore_rules = ignore_rules.extend(base, read_ignore_file(Path(docs_dir, base, name)))
+        ignore_prefix = ''.join(f"{part}/" for part in rel_root)
+    
+    # Collect all .md files recursively
+    md_files = list(iter_markdown_files(docs_path, include, exclude, ignore_rules, ignore_prefix))
+    
+    print(f"✓ Found {len(md_files)} markdown files in {root_folder}")
+    return md_files, docs_path
+
+
+def list_git_markdown_files(mirror_dir, ref, root_folder=".", include=None, exclude=None, ignore_files=False):
+    """List the markdown blobs below root_folder in the tree of ref.
+    
+    Returns (md_files, root_path, blobs) where md_files are repository-relative
+    paths in the same order collect_markdown_files would produce, and blobs maps
+    each of them to its blob id. With ignore_files, .gitignore and .llmsignore
+    files in the tree are honoured.
+    """
+    root_path = PurePosixPath(root_folder.strip('/') or '.')
+    cmd = ["git", "-C", str(mirror_dir), "ls-tree", "-r", "-z", "--full-tree", ref]
+    if str(root_path) != '.':
+        cmd += ["--", f"{root_path}/"]
+        # Ignore files of the folders above the docs root apply too
+        for depth in range(len(root_path.parts)):
+            base = ''.join(f"{part}/" for part in root_path.parts[:depth])
+            cmd += [f"{base}{name}" for name in IGNORE_FILES]
+    output = run_command(cmd)
+    if output is None:
+        print(f"✗ Could not list files of {ref}")
+        return [], root_path, {}
+    
+    include_match = make_path_matcher(include or DEFAULT_INCLUDE)
+    exclude_match = make_path_matcher(exclude)
+    
+    blobs = {}
+    ignore_blobs = []
+    for entry in output.split('\0'):
+        meta, sep, path = entry.partition('\t')
+        if not sep:
+            continue
+        mode, obj_type, oid = meta.split()
+        md_file = PurePosixPath(path)
+        if ignore_files and md_file.name in IGNORE_FILES:
+            ignore_blobs.append((md_file, oid))
+            continue
+        rel_path = get_relative_path(md_file, root_path) + md_file.suffix
+        if obj_type != 'blob' or not include_match(rel_path) or exclude_match(rel_path):
+            continue
+        # Skip common non-documentation files and excluded directories
+        rel_dirs = PurePosixPath(rel_path).parent.parts
+        if any(part in EXCLUDED_DIRS for part in md_file.parent.parts):
+            continue
+        if any(exclude_match('/'.join(rel_dirs[:depth])) or exclude_match('/'.join(rel_dirs[:depth]) + '/')
+               for depth in range(1, len(rel_dirs) + 1)):
+            continue
+        blobs[md_file] = oid
+    
+    if ignore_blobs:
+        rules = load_git_ignore_rules(mirror_dir, ref, ignore_blobs)
+        blobs = {md_file: oid for md_file, oid in blobs.items() if not rules.excludes(md_file.as_posix())}
+    
+    md_files = sorted(blobs, key=lambda md_file: md_file.parts)
+    print(f"✓ Found {len(md_files)} markdown files in {root_folder}")
+    return md_files, root_path, blobs
+
+
+def load_git_ignore_rules(mirror_dir, ref, ignore_blobs):
+    """Compile the ignore files listed as (path, blob id) pairs, shallowest folders first."""
+    with mirror_lock(mirror_dir):
+        prefetch_blobs(mirror_dir, ref, [oid for _, oid in ignore_blobs])
+    
+    rules = IgnoreRules()
+    ordered = sorted(ignore_blobs, key=lambda item: (len(item[0].parts), item[0].parent.parts,
+                                                     IGNORE_FILES.index(item[0].name)))
+    with GitBlobReader(mirror_dir) as reader:
+        for path, oid in ordered:
+            base = ''.join(f"{part}/" for part in path.parent.parts)
+            rules = rules.extend(base, reader.read_text(oid).splitlines())
+    return rules
+
+
+def prefetch_blobs(mirror_dir, ref, oids):
+    """Fetch the listed blobs that a blobless mirror does not have yet, in one request."""
+    output = run_command(["git", "-C", str(mirror_dir), "rev-list", "--objects", "--missing=print", ref])
+    if output is None:
+        return False
+    missing = {line[1:] for line in output.splitlines() if line.startswith('?')}
+    wanted = sorted(set(oids) & missing)
+    if not wanted:
+        return True
+    
+    print(f"  Fetching {len(wanted)} markdown blobs...")
+    cmd = [
+        "git", "-C", str(mirror_dir), "-c", "fetch.negotiationAlgorithm=noop",
+        "fetch", "--no-tags", "--no-write-fetch-head", "--recurse-submodules=no",
+        "--filter=blob:none", "--stdin", "origin"
+    ]
+    try:
+        subprocess.run(cmd, input="\n".join(wanted) + "\n", capture_output=True, text=True, check=True)
+    except subprocess.CalledProcessError:
+        # Blobs will still be fetched lazily, one by one, by cat-file
+        print(f"  ⚠ Could not prefetch markdown blobs")
+        return False
+    return True
+
+
+class GitBlobReader:
+    """Read blobs through one long-running `git cat-file --batch` process."""
+    
+    def __init__(self, repo_dir):
+        self.process = subprocess.Popen(
+            ["git", "-C", str(repo_dir), "cat-file", "--batch"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE
+        )
+        self.lock = threading.Lock()
+    
+    def read(self, oid):
+        """Return the raw bytes of a blob."""
+        with self.lock:
+            self.process.stdin.write(f"{oid}\n".encode('ascii'))
+            self.process.stdin.flush()
+            header = self.process.stdout.readline().decode('ascii').split()
+            if len(header) != 3:
+                raise IOError(f"blob {oid} is missing")
+            data = self.process.stdout.read(int(header[2]))
+            self.process.stdout.read(1)
+            return data
+    
+    def read_text(self, oid):
+        """Return a blob decoded as UTF-8 with newlines normalized like open() does."""
+        return decode_text(self.read(oid))
+    
+    def close(self):
+        self.process.stdin.close()
+        self.process.wait()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def decode_text(data):
+    """Decode UTF-8 bytes with newlines normalized like open() does."""
+    return data.decode('utf-8').replace('\r\n', '\n').replace('\r', '\n')
+
+
+PREFIX_READ_SIZE = 16 * 1024
+
+
+def iter_prefix_lines(stream, size=PREFIX_READ_SIZE):
+    """Yield the lines of a binary stream, decoding only as far as the caller reads.
+    
+    The stream is read in chunks that start at size bytes and double with every
+    refill, so a scan that stops early touches only a small prefix of a large file.
+    Lines are decoded and newline-translated exactly as open() would.
+    """
+    decoder = io.IncrementalNewlineDecoder(codecs.getincrementaldecoder('utf-8')(), translate=True)
+    pending = ''
+    while True:
+        chunk = stream.read(size)
+        lines = (pending + decoder.decode(chunk, final=not chunk)).split('\n')
+        pending = lines.pop()
+        for line in lines:
+            yield line + '\n'
+        if not chunk:
+            if pending:
+                yield pending
+            return
+        size *= 2
+
+
+# Patterns of the markdown scanner, compiled once
+FRONT_MATTER_FIELD_RE = re.compile(r'(title|description)[ \t]*:(?:[ \t]+(.*))?$')
+BLOCK_SCALAR_RE = re.compile(r'[|>][-+]?$')
+CLOSING_HASHES_RE = re.compile(r'[ \t]+#+$')
+FENCE_RE = re.compile(r'`{3,}|~{3,}')
+DESCRIPTION_LIMIT = 300
+# Front matter longer than this is taken for a document that starts with a thematic break
+FRONT_MATTER_MAX_LINES = 200
+
+
+def limit_description(text):
+    """Truncate a description to DESCRIPTION_LIMIT characters."""
+    if len(text) > DESCRIPTION_LIMIT:
+        return text[:DESCRIPTION_LIMIT - 3] + "..."
+    return text
+
+
+def read_front_matter(first_line, lines):
+    """Read the YAML front matter block that first_line may open.
+    
+    Returns (block, lines): the lines between the delimiters, or None when there is
+    no front matter, and the lines left to scan. Without a closing `---`/`...` within
+    FRONT_MATTER_MAX_LINES the lines read are handed back for the normal scan.
+    """
+    if first_line.lstrip('\ufeff').rstrip() != '---':
+        return None, chain([first_line], lines)
+    block = []
+    for line in islice(lines, FRONT_MATTER_MAX_LINES):
+        if line.rstrip() in ('---', '...'):
+            return block, lines
+        block.append(line)
+    return None, chain([first_line], block, lines)
+
+
+def parse_front_matter(lines):
+    """Return (title, description) from the lines of a YAML front matter block.
+    
+    Only the top-level `title` and `description` scalars are looked at, including
+    values continued on indented lines and `|`/`>` block scalars.
+    """
+    fields = {}
+    key = None
+    for line in lines:
+        line = line.rstrip()
+        match = FRONT_MATTER_FIELD_RE.match(line)
+        if match:
+            key = match.group(1)
+            fields[key] = [match.group(2) or '']
+        elif key and line[:1] in (' ', '\t'):
+            fields[key].append(line.strip())
+        elif line:
+            key = None
+    
+    values = []
+    for key in ('title', 'description'):
+        parts = fields.get(key, [])
+        if parts and BLOCK_SCALAR_RE.match(parts[0]):
+            parts = parts[1:]
+        value = ' '.join(part for part in parts if part)
+        if len(value) >= 2 and value[0] in '"\'' and value[-1] == value[0]:
+            value = value[1:-1]
+        values.append(value.strip() or None)
+    return tuple(values)
+
+
+def scan_markdown_lines(lines):
+    """Extract the title and description from an iterable of markdown lines in one pass.
+    
+    A `title` or `description` in YAML front matter takes precedence over the first
+    H1 heading and the first paragraph. Fenced code blocks, HTML comments and
+    horizontal rules are skipped, and reading stops as soon as both are known.
+    """
+    lines = iter(lines)
+    title = description = None
+    
+    front_matter, lines = read_front_matter(next(lines, ''), lines)
+    if front_matter is not None:
+        title, description = parse_front_matter(front_matter)
+        if description:
+            description = limit_description(description)
+    
+    paragraph = []
+    length = -1
+    fence = None
+    in_comment = False
+    
+    # Checked before pulling each line so that nothing past the last needed line is read
+    while title is None or description is None:
+        line = next(lines, None)
+        if line is None:
+            break
+        line = line.strip()
+        
+        if fence:
+            if line.startswith(fence):
+                fence = None
+            continue
+        if in_comment:
+            in_comment = '-->' not in line
+            continue
+        
+        if line and not line.startswith(('#', '---', '<!--', '```', '~~~')):
+            if description is None:
+                paragraph.append(line)
+                length += len(line) + 1
+                if length > DESCRIPTION_LIMIT:
+                    description = limit_description(' '.join(paragraph))
+            continue
+        
+        # Anything else ends the paragraph being collected
+        if paragraph and description is None:
+            description = limit_description(' '.join(paragraph))
+        
+        if line.startswith('#'):
+            if title is None and (line.startswith('# ') or line == '#'):
+                title = CLOSING_HASHES_RE.sub('', line[2:]).strip() or None
+        elif line.startswith('<!--'):
+            in_comment = '-->' not in line[4:]
+        elif line.startswith(('```', '~~~')):
+            fence = FENCE_RE.match(line).group()
+    
+    if paragraph and description is None:
+        description = limit_description(' '.join(paragraph))
+    return title, description or "Documentation section."
+
+
+def get_relative_path(file_path, root_path):
+    """Get the relative path from root for URL generation."""
+    try:
+        rel_path = file_path.relative_to(root_path)
+        # Convert to URL path (forward slashes, no extension)
+        url_path = str(rel_path.with_suffix('')).replace(os.sep, '/')
+        return url_path
+    except ValueError:
+        return file_path.stem
+
+
+@contextmanager
+def open_mapped(path):
+    """Map a file read-only into memory, yielding None for empty files that cannot be mapped."""
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            yield None
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            yield mapped
+
+
+class Document:
+    """Compact record of one parsed markdown file, shared by both writers and the manifest.
+    
+    The folder part of the URL path is interned so that documents of one folder
+    share it, and fields are stored in slots rather than a per-record dict.
+    """
+    
+    __slots__ = ('path', 'url_dir', 'url_name', 'title', 'description', 'body',
+                 'fingerprint', 'cached', 'offset', 'length', 'tokens')
+    
+    def __init__(self, path, url_path, title, description, body=None,
+                 fingerprint=None, cached=False, offset=None, length=None, tokens=None):
+        url_dir, _, url_name = url_path.rpartition('/')
+        self.path = path
+        self.url_dir = sys.intern(url_dir)
+        self.url_name = url_name
+        self.title = title
+        self.description = description
+        self.body = body
+        self.fingerprint = fingerprint
+        # Cached documents are copied from offset and length of the previous llms-full.txt
+        self.cached = cached
+        self.offset = offset
+        self.length = length
+        self.tokens = tokens
+    
+    @property
+    def url_path(self):
+        return f"{self.url_dir}/{self.url_name}" if self.url_dir else self.url_name
+    
+    def manifest_entry(self):
+        """Return the manifest entry of the document."""
+        return {'hash': self.fingerprint, 'title': self.title, 'description': self.description,
+                'offset': self.offset, 'length': self.length, 'tokens': self.tokens}
+
+
+def parse_markdown_file(md_file, root_path, read=None, keep_body=True, use_mmap=False, counter=None):
+    """Read a markdown file once and return its parsed Document.
+    
+    read, when given, returns the raw bytes of md_file instead of opening it on disk;
+    the decoded content is kept as the record's body unless keep_body is false.
+    Otherwise the record's body is None and the file is streamed when written.
+    Only the prefix needed for the title and description is decoded and scanned,
+    straight from the page cache when use_mmap is set. With a token counter, the
+    document's tokens are counted too, from its size alone when the counter allows.
+    """
+    if read:
+        data = read(md_file)
+        title, description = scan_markdown_lines(iter_prefix_lines(io.BytesIO(data)))
+        content = decode_text(data) if keep_body else None
+    elif use_mmap:
+        content = None
+        with open_mapped(md_file) as mapped:
+            title, description = scan_markdown_lines(iter_prefix_lines(mapped or io.BytesIO()))
+    else:
+        # Only the beginning is read here; the body is streamed from disk when written
+        content = None
+        with open(md_file, 'rb') as f:
+            title, description = scan_markdown_lines(iter_prefix_lines(f))
+    
+    tokens = None
+    if counter is not None:
+        if not counter.needs_text:
+            tokens = counter.count_size(len(data) if read else os.path.getsize(md_file))
+        elif read:
+            tokens = counter.count_text(content if content is not None else decode_text(data))
+        else:
+            with open(md_file, 'r', encoding='utf-8') as f:
+                tokens = counter.count_text(f.read())
+    
+    url_path = get_relative_path(md_file, root_path)
+    title = title or url_path.replace('/', ' > ').replace('-', ' ').title()
+    
+    return Document(md_file, url_path, title, description, content, tokens=tokens)
+
+
+def iter_documents(md_files, root_path, jobs=1, load=parse_markdown_file, report_error=print):
+    """Yield a parsed Document for each readable markdown file, in order.
+    
+    With jobs > 1 files are read and parsed on a thread pool, but records are
+    still yielded in the order of md_files. Unreadable files are passed to report_error.
+    """
+    if jobs <= 1:
+        for md_file in md_files:
+            try:
+                yield load(md_file, root_path)
+            except Exception as e:
+                report_error(f"  ✗ Error reading {md_file.name}: {e}")
+                continue
+        return
+    
+    # Keep a bounded window of in-flight files so memory stays proportional to jobs
+    files = iter(md_files)
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        pending = deque(
+            (md_file, executor.submit(load, md_file, root_path))
+            for md_file in islice(files, jobs * 4)
+        )
+        while pending:
+            md_file, future = pending.popleft()
+            next_file = next(files, None)
+            if next_file is not None:
+                pending.append((next_file, executor.submit(load, next_file, root_path)))
+            try:
+                yield future.result()
+            except Exception as e:
+                report_error(f"  ✗ Error reading {md_file.name}: {e}")
+                continue
+
+
+COPY_CHUNK_SIZE = 1024 * 1024
+MANIFEST_FORMAT = 2
+
+
+def compute_fingerprints(repo_dir, md_files):
+    """Map each markdown file to a content fingerprint (git blob hash, or mtime and size)."""
+    blobs = {}
+    output = run_command(["git", "-C", str(repo_dir), "ls-files", "-s", "-z"])
+    if output:
+        for entry in output.split('\0'):
+            meta, sep, rel_path = entry.partition('\t')
+            if sep:
+                blobs[rel_path] = meta.split()[1]
+    
+    fingerprints = {}
+    for md_file in md_files:
+        try:
+            rel_path = md_file.relative_to(repo_dir).as_posix()
+        except ValueError:
+            rel_path = None
+        if rel_path in blobs:
+            fingerprints[md_file] = blobs[rel_path]
+        else:
+            stat = md_file.stat()
+            fingerprints[md_file] = f"{stat.st_mtime_ns}:{stat.st_size}"
+    return fingerprints
+
+
+def load_manifest(manifest_file, settings, llms_full_file=None):
+    """Load the entries of a previous run's manifest.
+    
+    Returns (entries, full_valid) where full_valid tells whether the byte offsets
+    recorded in the manifest still describe the existing llms-full.txt.
+    """
+    try:
+        with open(manifest_file, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {}, False
+    
+    if manifest.get('settings') != settings:
+        return {}, False
+    
+    # The size alone misses a same-sized llms-full.txt written without this manifest
+    full_stat = manifest.get('full_stat')
+    full_valid = False
+    if llms_full_file and full_stat:
+        try:
+            stat = os.stat(llms_full_file)
+            full_valid = [stat.st_size, stat.st_mtime_ns] == full_stat
+        except OSError:
+            pass
+    return manifest.get('files', {}), full_valid
+
+
+class ManifestWriter:
+    """Write the per-file manifest used by the next incremental run while documents are processed.
+    
+    Each entry goes to a temporary file as soon as its document is done, so nothing
+    is kept per document; install() moves the finished manifest into place.
+    """
+    
+    def __init__(self, manifest_file, settings):
+        self.manifest_file = manifest_file
+        self.tmp_file = f"{manifest_file}.tmp"
+        self.out = open(self.tmp_file, 'w', encoding='utf-8')
+        self.out.write(f'{{"settings": {json.dumps(settings)}, "files": {{')
+        self.count = 0
+        self.finished = False
+    
+    def add(self, doc):
+        """Write the entry of one document."""
+        separator = "," if self.count else ""
+        self.out.write(f'{separator}\n {json.dumps(doc.url_path)}: {json.dumps(doc.manifest_entry())}')
+        self.count += 1
+    
+    def finish(self, full_stat=None):
+        """Write the size and mtime of the llms-full.txt the entries' offsets refer to and close the file.
+        
+        full_stat is the os.stat_result of the finished llms-full.txt, if there is one.
+        """
+        stamp = [full_stat.st_size, full_stat.st_mtime_ns] if full_stat else None
+        self.out.write(f'\n}}, "full_stat": {json.dumps(stamp)}}}\n')
+        self.out.close()
+        self.finished = True
+    
+    def install(self):
+        os.replace(self.tmp_file, self.manifest_file)
+    
+    def abort(self):
+        """Drop the unfinished manifest after the run has failed."""
+        if self.finished:
+            return
+        self.out.close()
+        try:
+            os.remove(self.tmp_file)
+        except OSError:
+            pass
+
+
+def copy_byte_range(src, dst, offset, length, chunk_size=COPY_CHUNK_SIZE, digest=None):
+    """Copy length bytes starting at offset from binary file src to binary file dst.
+    
+    digest, when given, is updated with the copied bytes.
+    """
+    src.seek(offset)
+    while length > 0:
+        chunk = src.read(min(chunk_size, length))
+        if not chunk:
+            raise IOError(f"{src.name} is truncated")
+        dst.write(chunk)
+        if digest:
+            digest.update(chunk)
+        length -= len(chunk)
+
+
+def build_url(url_path, base_url=None):
+    """Build the link for a document, prefixed by base_url when provided."""
+    if base_url:
+        return f"{base_url.rstrip('/')}/{url_path}"
+    return url_path
+
+
+def write_llms_txt_header(out, project_name, base_url=None, version=None, description=None):
+    """Write the llms.txt header up to the start of the index."""
+    title = f"{project_name} Documentation"
+    if version:
+        title += f" - {version}"
+    
+    out.write(f"# {title}\n\n")
+    
+    if description:
+        out.write(f"> {description}\n\n")
+    
+    if base_url:
+        out.write(f"Website: {base_url}\n")
+    
+    out.write("\n")
+    
+    # Write index of all documents
+    out.write("## Documentation Index\n\n")
+
+
+def write_llms_txt_entry(out, doc, base_url=None, counter=None):
+    """Write the index entry of one document to llms.txt, annotated with its tokens when counter is given."""
+    out.write(f"### [{doc.title}]({build_url(doc.url_path, base_url)})\n\n")
+    if counter and doc.tokens is not None:
+        out.write(f"{doc.description} ({counter.format(doc.tokens)} tokens)\n\n")
+    else:
+        out.write(f"{doc.description}\n\n")
+
+
+def write_llms_txt_footer(out, section_count, total_tokens=None, counter=None):
+    """Write the closing notes of llms.txt."""
+    out.write("\n---\n\n")
+    out.write("## Notes\n\n")
+    out.write("- For complete documentation content, see `llms-full.txt`\n")
+    out.write(f"- Total sections: {section_count}\n")
+    if counter and total_tokens is not None:
+        out.write(f"- Total tokens: {counter.format(total_tokens)}\n")
+
+
+def write_llms_full_header(out, project_name, base_url=None, version=None, description=None, tier="Complete"):
+    """Write the llms-full.txt header (or that of another tier, such as llms-medium.txt)."""
+    title = f"{project_name} Documentation - {tier}"
+    if version:
+        title += f" - {version}"
+    
+    out.write(f"# {title}\n\n")
+    
+    if description:
+        out.write(f"> {description}\n\n")
+    
+    if base_url:
+        out.write(f"Website: {base_url}\n")
+    
+    out.write("\n---\n\n")
+
+
+def copy_mapped_body(out, path):
+    """Copy a file into the text stream out through a memory map.
+    
+    Files without carriage returns are written as raw bytes, validated as UTF-8
+    chunk by chunk, instead of being decoded and re-encoded. Returns False when
+    the file needs newline translation and has to be copied as text instead.
+    """
+    with open_mapped(path) as mapped:
+        if mapped is None:
+            return True
+        if mapped.find(b'\r') != -1:
+            return False
+        
+        decoder = codecs.getincrementaldecoder('utf-8')()
+        view = memoryview(mapped)
+        out.flush()
+        try:
+            for start in range(0, len(view), COPY_CHUNK_SIZE):
+                with view[start:start + COPY_CHUNK_SIZE] as chunk:
+                    decoder.decode(chunk, final=start + COPY_CHUNK_SIZE >= len(view))
+                    out.buffer.write(chunk)
+        finally:
+            view.release()
+    return True
+
+
+def section_header(doc, base_url=None):
+    """Return the lines that open a document section of llms-full.txt."""
+    header = f"## {doc.title}\n\n**Path:** `{doc.url_path}.md`  \n"
+    if base_url:
+        return header + f"**URL:** {build_url(doc.url_path, base_url)}\n\n"
+    return header + f"**File:** `{doc.url_path}.md`\n\n"
+
+
+def write_llms_full_section(out, doc, base_url=None, use_mmap=False):
+    """Write one document section of llms-full.txt."""
+    out.write(section_header(doc, base_url))
+    if doc.body is None:
+        if not (use_mmap and copy_mapped_body(out, doc.path)):
+            # Stream the body from disk in chunks so memory does not grow with file size
+            with open(doc.path, 'r', encoding='utf-8') as src:
+                shutil.copyfileobj(src, out, COPY_CHUNK_SIZE)
+    else:
+        out.write(doc.body)
+    out.write("\n\n")
+    out.write("---\n\n")
+
+
+class ProgressReporter:
+    """Report the progress of a run without printing a line per file.
+    
+    At verbosity 1 a single status line is updated in place on a terminal, and a
+    summary is printed every few seconds otherwise; verbosity 2 prints every file
+    and verbosity 0 nothing. json_stream, when given, receives JSON lines events,
+    which carry the fields of job (e.g. repo and output path) to tell concurrent jobs apart.
+    """
+    
+    LIVE_INTERVAL = 0.1
+    SUMMARY_INTERVAL = 5.0
+    JSON_INTERVAL = 1.0
+    # Jobs running concurrently share the JSON stream
+    json_lock = threading.Lock()
+    
+    def __init__(self, total, label, verbosity=1, json_stream=None, live=None, job=None):
+        self.total = total
+        self.label = label
+        self.job = job or {}
+        self.verbosity = verbosity
+        self.json_stream = json_stream
+        self.live = sys.stdout.isatty() if live is None else live
+        self.done = self.reused = self.errors = 0
+        self.started = time.monotonic()
+        self.next_status = self.started + (self.LIVE_INTERVAL if self.live else self.SUMMARY_INTERVAL)
+        self.next_json = self.started + self.JSON_INTERVAL
+        self.line_shown = False
+        self.emit('start', self.started)
+    
+    def update(self, name, reused=False):
+        """Count one processed file."""
+        self.done += 1
+        self.reused += reused
+        now = time.monotonic()
+        if self.verbosity >= 2:
+            print(f"  [{self.done}/{self.total}] Processing {name}...")
+        elif self.verbosity == 1 and now >= self.next_status:
+            self.next_status = now + (self.LIVE_INTERVAL if self.live else self.SUMMARY_INTERVAL)
+            self.show_status(now)
+        if self.json_stream and now >= self.next_json:
+            self.next_json = now + self.JSON_INTERVAL
+            self.emit('progress', now)
+    
+    def error(self, message):
+        """Count one file that could not be processed and print why."""
+        self.done += 1
+        self.errors += 1
+        self.log(message)
+    
+    def log(self, message):
+        """Print a message without garbling the status line."""
+        if self.line_shown:
+            sys.stdout.write("\r\x1b[K")
+            self.line_shown = False
+        print(message)
+    
+    def status(self, now):
+        elapsed = now - self.started
+        rate = self.done / elapsed if elapsed > 0 else 0
+        percent = 100 * self.done / self.total if self.total else 100
+        return f"  {self.label}: {self.done}/{self.total} files ({percent:.0f}%), {rate:.0f} files/s"
+    
+    def show_status(self, now):
+        if self.live:
+            sys.stdout.write(f"\r\x1b[K{self.status(now)}")
+            sys.stdout.flush()
+            self.line_shown = True
+        else:
+            print(self.status(now))
+    
+    def emit(self, event, now):
+        if not self.json_stream:
+            return
+        elapsed = now - self.started
+        record = {
+            'event': event, 'label': self.label, **self.job, 'done': self.done, 'total': self.total,
+            'reused': self.reused, 'errors': self.errors, 'elapsed': round(elapsed, 3)
+        }
+        with self.json_lock:
+            self.json_stream.write(json.dumps(record) + "\n")
+            self.json_stream.flush()
+    
+    def finish(self):
+        """Print the final summary and emit the closing event."""
+        now = time.monotonic()
+        if self.line_shown:
+            sys.stdout.write("\r\x1b[K")
+            self.line_shown = False
+        if self.verbosity >= 1:
+            print(f"  Processed {self.done} files in {now - self.started:.1f}s "
+                  f"({self.reused} reused, {self.errors} errors)")
+        self.emit('finish', now)
+
+
+SIZE_RE = re.compile(r'(\d+(?:\.\d+)?)\s*([kmg]?)\s*(b|bytes?|t|tokens?)?$', re.IGNORECASE)
+SIZE_UNITS = {'': 1, 'k': 1024, 'm': 1024 ** 2, 'g': 1024 ** 3}
+# Token counts are quoted in decimal thousands and millions
+TOKEN_UNITS = {'': 1, 'k': 1000, 'm': 1000 ** 2, 'g': 1000 ** 3}
+# Rough number of bytes per token of English prose and markdown
+BYTES_PER_TOKEN = 4
+
+
+def parse_size(text):
+    """Parse a size such as 50M, 512KB, 200kt or "200k tokens" into a number of bytes.
+    
+    Byte suffixes are binary (K = 1024) and token suffixes decimal (k = 1000);
+    token counts are converted with BYTES_PER_TOKEN.
+    """
+    match = SIZE_RE.match(text.strip())
+    if not match:
+        raise argparse.ArgumentTypeError(f"invalid size: {text!r} (e.g. 50M, 512KB or 200kt)")
+    number, unit, kind = match.groups()
+    if kind and kind.lower().startswith('t'):
+        size = float(number) * TOKEN_UNITS[unit.lower()] * BYTES_PER_TOKEN
+    else:
+        size = float(number) * SIZE_UNITS[unit.lower()]
+    if size < 1:
+        raise argparse.ArgumentTypeError(f"size must be positive: {text!r}")
+    return int(size)
+
+
+def shard_manifest_file(llms_full_file):
+    """Return the path of the shard manifest that belongs to llms_full_file."""
+    llms_full_file = Path(llms_full_file)
+    return llms_full_file.with_name(f"{llms_full_file.stem}-shards.json")
+
+
+class ShardWriter:
+    """Split llms-full.txt into shards at document boundaries while it is being written.
+    
+    Every shard starts with the llms-full.txt header and holds whole sections up to
+    shard_size bytes (a larger section gets a shard of its own). As soon as a shard
+    is complete it is copied out of the file being written on a thread pool, so the
+    shards are written in parallel with each other and with the rest of the pass.
+    """
+    
+    WORKERS = 4
+    
+    def __init__(self, llms_full_file, source_file, full_out, header_length, shard_size):
+        self.llms_full_file = Path(llms_full_file)
+        self.source_file = source_file
+        self.full_out = full_out
+        self.header_length = header_length
+        self.shard_size = shard_size
+        self.sections = []
+        self.sections_size = 0
+        self.futures = []
+        self.executor = ThreadPoolExecutor(max_workers=self.WORKERS)
+    
+    def add(self, doc):
+        """Add a document whose section has just been written to llms-full.txt."""
+        if self.sections and self.header_length + self.sections_size + doc.length > self.shard_size:
+            self.close_shard()
+        self.sections.append({'path': doc.url_path, 'title': doc.title,
+                              'offset': doc.offset, 'length': doc.length})
+        self.sections_size += doc.length
+    
+    def close_shard(self):
+        # Sections are contiguous, so a shard is the header plus one byte range
+        self.full_out.flush()
+        shard_file = self.llms_full_file.with_name(
+            f"{self.llms_full_file.stem}-{len(self.futures) + 1:03d}.txt"
+        )
+        self.futures.append(self.executor.submit(self.write_shard, shard_file, self.sections))
+        self.sections = []
+        self.sections_size = 0
+    
+    def write_shard(self, shard_file, sections):
+        digest = hashlib.sha256()
+        start = sections[0]['offset']
+        end = sections[-1]['offset'] + sections[-1]['length']
+        tmp_file = f"{shard_file}.tmp"
+        with open(self.source_file, 'rb') as src, open(tmp_file, 'wb') as dst:
+            copy_byte_range(src, dst, 0, self.header_length, digest=digest)
+            copy_byte_range(src, dst, start, end - start, digest=digest)
+        os.replace(tmp_file, shard_file)
+        return {
+            'file': shard_file.name,
+            'size': self.header_length + end - start,
+            'sha256': digest.hexdigest(),
+            'sections': [{'path': section['path'], 'title': section['title']} for section in sections]
+        }
+    
+    def finish(self):
+        """Wait for every shard, write the shard manifest and return the list of shards."""
+        if self.sections:
+            self.close_shard()
+        try:
+            shards = [future.result() for future in self.futures]
+        finally:
+            self.executor.shutdown()
+        
+        manifest_file = shard_manifest_file(self.llms_full_file)
+        remove_shards(self.llms_full_file, keep={shard['file'] for shard in shards})
+        tmp_file = f"{manifest_file}.tmp"
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump({'shard_size': self.shard_size, 'shards': shards}, f, indent=1)
+        os.replace(tmp_file, manifest_file)
+        return shards
+    
+    def abort(self):
+        """Stop writing shards after the pass has failed."""
+        self.executor.shutdown(wait=True)
+
+
+def remove_shards(llms_full_file, keep=()):
+    """Delete the shards listed by an existing shard manifest, except those named in keep."""
+    manifest_file = shard_manifest_file(llms_full_file)
+    try:
+        with open(manifest_file, 'r', encoding='utf-8') as f:
+            shards = json.load(f).get('shards', [])
+    except (OSError, ValueError):
+        return
+    for shard in shards:
+        name = Path(shard.get('file', '')).name
+        if name and name not in keep:
+            try:
+                os.remove(Path(llms_full_file).with_name(name))
+            except OSError:
+                pass
+    if not keep:
+        try:
+            os.remove(manifest_file)
+        except OSError:
+            pass
+
+
+class ApproximateTokenCounter:
+    """Estimate tokens from the size of a text alone, at BYTES_PER_TOKEN bytes per token."""
+    
+    name = 'approx'
+    needs_text = False
+    
+    def count_size(self, size):
+        return (size + BYTES_PER_TOKEN - 1) // BYTES_PER_TOKEN
+    
+    def count_text(self, text):
+        return self.count_size(len(text.encode('utf-8')))
+    
+    def format(self, tokens):
+        return f"~{tokens:,}"
+
+
+class TiktokenCounter:
+    """Count tokens exactly with a tiktoken encoding (requires the tiktoken package)."""
+    
+    needs_text = True
+    
+    def __init__(self, encoding='cl100k_base'):
+        self.name = f"tiktoken:{encoding}"
+        self.encoding = tiktoken.get_encoding(encoding)
+    
+    def count_text(self, text):
+        return len(self.encoding.encode(text, disallowed_special=()))
+    
+    def format(self, tokens):
+        return f"{tokens:,}"
+
+
+def make_token_counter(tokenizer):
+    """Create the token counter named by --tokenizer: 'approx' or 'tiktoken[:ENCODING]'."""
+    name, _, encoding = tokenizer.partition(':')
+    if name == 'approx':
+        return ApproximateTokenCounter()
+    if name == 'tiktoken':
+        if tiktoken is None:
+            raise ValueError("tiktoken is required for --tokenizer tiktoken (pip install tiktoken)")
+        return TiktokenCounter(encoding or 'cl100k_base')
+    raise ValueError(f"unknown tokenizer: {tokenizer!r} (use approx or tiktoken[:ENCODING])")
+
+
+def tier_file(output_file, tier):
+    """Return the path of another output tier, e.g. llms-medium[-VERSION].txt next to llms-full[-VERSION].txt.
+    
+    output_file is the job's llms-full.txt, or its llms.txt.
+    """
+    output_file = Path(output_file)
+    prefix = 'llms-full' if output_file.name.startswith('llms-full') else 'llms'
+    return output_file.with_name(f"llms-{tier}{output_file.name[len(prefix):]}")
+
+
+def section_priority(doc):
+    """Sort key of the sections kept first in a token budget: shallow pages, index pages first."""
+    return doc.url_path.count('/'), doc.url_name.lower() not in ('index', 'readme')
+
+
+def write_budget_tier(llms_full_file, tier_path, header, sections, max_tokens, counter):
+    """Write a tier that greedily fits the highest-priority sections of llms-full.txt in max_tokens.
+    
+    sections are (priority, offset, length, tokens) tuples in llms-full.txt order.
+    Sections are taken by priority while they fit, then written in their original order.
+    Returns (kept sections, total tokens).
+    """
+    remaining = max_tokens - counter.count_text(header)
+    kept = set()
+    for idx in sorted(range(len(sections)), key=lambda idx: sections[idx][0]):
+        tokens = sections[idx][3]
+        if tokens <= remaining:
+            kept.add(idx)
+            remaining -= tokens
+    
+    tmp_file = f"{tier_path}.tmp"
+    with open(llms_full_file, 'rb') as src, open(tmp_file, 'w', encoding='utf-8') as out:
+        out.write(header)
+        out.flush()
+        for idx in sorted(kept):
+            copy_byte_range(src, out.buffer, sections[idx][1], sections[idx][2])
+    os.replace(tmp_file, tier_path)
+    return len(kept), max_tokens - remaining
+
+
+# File extension of each --compress codec
+COMPRESSION_SUFFIXES = {'gzip': '.gz', 'zstd': '.zst', 'brotli': '.br'}
+
+
+def parse_codecs(text):
+    """Parse a comma-separated list of --compress codecs, checking that each one is available."""
+    names = tuple(dict.fromkeys(codec.strip().lower() for codec in text.split(',') if codec.strip()))
+    for codec in names:
+        if codec not in COMPRESSION_SUFFIXES:
+            raise argparse.ArgumentTypeError(
+                f"unknown codec: {codec!r} (choose from {', '.join(COMPRESSION_SUFFIXES)})"
+            )
+        if codec == 'zstd' and zstandard is None:
+            raise argparse.ArgumentTypeError("zstandard is required for zstd (pip install zstandard)")
+        if codec == 'brotli' and brotli is None:
+            raise argparse.ArgumentTypeError("brotli is required for brotli (pip install brotli)")
+    return names
+
+
+def remove_compressed(output, keep=()):
+    """Delete compressed copies of output left by an earlier run for codecs not in keep."""
+    for codec, suffix in COMPRESSION_SUFFIXES.items():
+        if codec not in keep:
+            try:
+                os.remove(f"{output}{suffix}")
+            except OSError:
+                pass
+
+
+class BrotliWriter:
+    """Minimal writable stream over a brotli.Compressor."""
+    
+    def __init__(self, fileobj):
+        self.fileobj = fileobj
+        self.compressor = brotli.Compressor()
+    
+    def write(self, data):
+        self.fileobj.write(self.compressor.process(data))
+    
+    def finish(self):
+        self.fileobj.write(self.compressor.finish())
+
+
+@contextmanager
+def open_compressor(codec, path):
+    """Open path for writing a compressed stream in the given --compress codec."""
+    with open(path, 'wb') as f:
+        if codec == 'gzip':
+            # No file name or timestamp in the header, so unchanged outputs compress identically
+            with gzip.GzipFile(filename='', mode='wb', fileobj=f, mtime=0) as out:
+                yield out
+        elif codec == 'zstd':
+            with zstandard.ZstdCompressor().stream_writer(f, closefd=False) as out:
+                yield out
+        else:
+            out = BrotliWriter(f)
+            yield out
+            out.finish()
+
+
+class FileCompressor:
+    """Compress a file on a background thread while it is being written.
+    
+    The thread follows the file up to the offset last passed to commit(), so a
+    section that may still be rolled back is never compressed, and the compressed
+    copy is finished moments after the file itself instead of in a second pass.
+    """
+    
+    def __init__(self, source_file, target_file, codec):
+        self.source_file = source_file
+        self.target_file = Path(target_file)
+        self.tmp_file = f"{target_file}.tmp"
+        self.codec = codec
+        self.committed = 0
+        self.done = self.aborted = False
+        self.error = None
+        self.condition = threading.Condition()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+    
+    def commit(self, offset):
+        """Let the thread compress the file up to offset, which must already be flushed."""
+        with self.condition:
+            self.committed = offset
+            self.condition.notify()
+    
+    def run(self):
+        try:
+            with open(self.source_file, 'rb') as src, open_compressor(self.codec, self.tmp_file) as dst:
+                position = 0
+                while True:
+                    with self.condition:
+                        while self.committed == position and not (self.done or self.aborted):
+                            self.condition.wait()
+                        committed, done, aborted = self.committed, self.done, self.aborted
+                    if aborted:
+                        break
+                    if committed > position:
+                        copy_byte_range(src, dst, position, committed - position)
+                        position = committed
+                    elif done:
+                        break
+        except Exception as e:
+            self.error = e
+    
+    def finish(self, offset):
+        """Compress the file up to its final offset and move the result into place."""
+        with self.condition:
+            self.committed = offset
+            self.done = True
+            self.condition.notify()
+        self.thread.join()
+        if self.error:
+            raise self.error
+        os.replace(self.tmp_file, self.target_file)
+    
+    def abort(self):
+        """Stop compressing after the run has failed, leaving no partial file behind."""
+        if self.done:
+            return
+        with self.condition:
+            self.aborted = True
+            self.condition.notify()
+        self.thread.join()
+        try:
+            os.remove(self.tmp_file)
+        except OSError:
+            pass
+
+
+def compress_file(path, compress):
+    """Write a compressed copy of a finished file for each codec in compress, in parallel."""
+    size = os.path.getsize(path)
+    with ExitStack() as stack:
+        compressors = []
+        for codec in compress:
+            compressor = FileCompressor(path, f"{path}{COMPRESSION_SUFFIXES[codec]}", codec)
+            stack.callback(compressor.abort)
+            compressors.append(compressor)
+        for compressor in compressors:
+            compressor.finish(size)
+
+
+def generate_outputs(md_files, root_path, llms_file=None, llms_full_file=None, project_name=None,
+                     base_url=None, version=None, description=None, jobs=1,
+                     manifest_file=None, fingerprints=None, read=None, use_mmap=False,
+                     progress=None, shard_size=None, counter=None, token_counts=False, max_tokens=None,
+                     compress=()):
+    """Read and parse each document once, fanning it out to llms.txt and llms-full.txt.
+    
+    When manifest_file and fingerprints are given, files whose fingerprint matches
+    the previous run are not re-parsed: their title and description come from the
+    manifest and their llms-full.txt section is spliced from the previous output.
+    With use_mmap, files on disk are scanned and copied through memory maps.
+    progress is the ProgressReporter of the run (a default one when None).
+    With shard_size, llms-full.txt is also split into shards of about that many bytes.
+    counter counts the tokens of every document: token_counts annotates llms.txt with
+    them, and max_tokens writes an llms-medium.txt tier that fits in that many tokens.
+    compress names codecs (see COMPRESSION_SUFFIXES) in which both files are also
+    written, compressed on background threads during the pass.
+    """
+    if llms_file:
+        print(f"\nGenerating {llms_file} (index)...")
+    if llms_full_file:
+        print(f"\nGenerating {llms_full_file} (full documentation)...")
+    
+    settings = {'format': MANIFEST_FORMAT, 'base_url': base_url}
+    if counter:
+        # Token counts are cached, so they must come from the same tokenizer
+        settings['tokenizer'] = counter.name
+    fingerprints = fingerprints or {}
+    if progress is None:
+        progress = ProgressReporter(len(md_files), Path(llms_full_file or llms_file).name)
+    previous, full_valid = {}, False
+    if manifest_file:
+        previous, full_valid = load_manifest(manifest_file, settings, llms_full_file)
+    
+    def load(md_file, root_path):
+        url_path = get_relative_path(md_file, root_path)
+        entry = previous.get(url_path)
+        fingerprint = fingerprints.get(md_file)
+        reusable = (
+            entry is not None and fingerprint is not None and entry.get('hash') == fingerprint
+            and (not llms_full_file or (full_valid and entry.get('offset') is not None))
+        )
+        if reusable:
+            return Document(md_file, url_path, entry['title'], entry['description'],
+                            fingerprint=fingerprint, cached=True,
+                            offset=entry.get('offset'), length=entry.get('length'),
+                            tokens=entry.get('tokens'))
+        doc = parse_markdown_file(md_file, root_path, read, bool(llms_full_file), use_mmap, counter)
+        doc.fingerprint = fingerprint
+        return doc
+    
+    # The new llms-full.txt is written next to the old one, which unchanged sections are spliced from
+    full_tmp_file = f"{llms_full_file}.tmp" if llms_full_file else None
+    shards = None
+    total_tokens = 0
+    # Sections that llms-medium.txt is chosen from
+    tier_sections = [] if max_tokens and llms_full_file else None
+    
+    with ExitStack() as stack:
+        index_out = full_out = previous_full = shard_writer = manifest_writer = None
+        index_compressors, full_compressors = [], []
+        if manifest_file:
+            manifest_writer = ManifestWriter(manifest_file, settings)
+            stack.callback(manifest_writer.abort)
+        if llms_file:
+            index_out = stack.enter_context(open(llms_file, 'w', encoding='utf-8'))
+            write_llms_txt_header(index_out, project_name, base_url, version, description)
+            for codec in compress:
+                compressor = FileCompressor(llms_file, f"{llms_file}{COMPRESSION_SUFFIXES[codec]}", codec)
+                stack.callback(compressor.abort)
+                index_compressors.append(compressor)
+        if llms_full_file:
+            full_out = stack.enter_context(open(full_tmp_file, 'w', encoding='utf-8'))
+            write_llms_full_header(full_out, project_name, base_url, version, description)
+            for codec in compress:
+                compressor = FileCompressor(full_tmp_file, f"{llms_full_file}{COMPRESSION_SUFFIXES[codec]}", codec)
+                stack.callback(compressor.abort)
+                full_compressors.append(compressor)
+        if llms_full_file:
+            if full_valid:
+                previous_full = stack.enter_context(open(llms_full_file, 'rb'))
+            if shard_size:
+                shard_writer = ShardWriter(llms_full_file, full_tmp_file, full_out, full_out.tell(), shard_size)
+                stack.callback(shard_writer.abort)
+        
+        # Single pass: every document is read once and its index entry and section written at once
+        section_count = 0
+        for doc in iter_documents(md_files, root_path, jobs, load, progress.error):
+            if full_out:
+                offset = full_out.tell()
+                try:
+                    if doc.cached:
+                        full_out.flush()
+                        copy_byte_range(previous_full, full_out.buffer, doc.offset, doc.length)
+                    else:
+                        write_llms_full_section(full_out, doc, base_url, use_mmap)
+                except Exception as e:
+                    # Drop the partially written section, as if the file had not been readable
+                    progress.error(f"  ✗ Error reading {doc.path.name}: {e}")
+                    full_out.seek(offset)
+                    full_out.truncate()
+                    continue
+                doc.offset = offset
+                doc.length = full_out.tell() - offset
+                if shard_writer:
+                    shard_writer.add(doc)
+                # tell() has flushed the section, which can no longer be rolled back
+                for compressor in full_compressors:
+                    compressor.commit(doc.offset + doc.length)
+                if tier_sections is not None:
+                    tokens = doc.tokens + counter.count_text(section_header(doc, base_url) + "\n\n---\n\n")
+                    tier_sections.append((section_priority(doc) + (len(tier_sections),),
+                                          doc.offset, doc.length, tokens))
+            else:
+                doc.offset = doc.length = None
+            if index_out:
+                write_llms_txt_entry(index_out, doc, base_url, counter if token_counts else None)
+                section_count += 1
+                if index_compressors:
+                    index_size = index_out.tell()
+                    for compressor in index_compressors:
+                        compressor.commit(index_size)
+            if doc.tokens is not None:
+                total_tokens += doc.tokens
+            if manifest_writer and doc.fingerprint is not None:
+                manifest_writer.add(doc)
+            progress.update(doc.path.name, doc.cached)
+        
+        if index_out:
+            write_llms_txt_footer(index_out, section_count, total_tokens, counter if token_counts else None)
+            index_size = index_out.tell()
+            for compressor in index_compressors:
+                compressor.finish(index_size)
+        if full_out:
+            full_size = full_out.tell()
+            for compressor in full_compressors:
+                compressor.finish(full_size)
+        if shard_writer:
+            shards = shard_writer.finish()
+        if manifest_writer:
+            if full_out:
+                # Closed first so the recorded mtime is final; os.replace keeps it
+                full_out.close()
+                manifest_writer.finish(os.stat(full_tmp_file))
+            else:
+                manifest_writer.finish()
+    
+    progress.finish()
+    if llms_file:
+        remove_compressed(llms_file, keep=compress)
+    if llms_full_file:
+        os.replace(full_tmp_file, llms_full_file)
+        remove_compressed(llms_full_file, keep=compress)
+        if not shard_size:
+            remove_shards(llms_full_file)
+    if manifest_writer:
+        manifest_writer.install()
+        if progress.reused and progress.verbosity >= 1:
+            print(f"  Reused {progress.reused} unchanged files from {manifest_file}")
+    
+    if llms_file:
+        print(f"✓ llms.txt generated successfully")
+        size_kb = os.path.getsize(llms_file) / 1024
+        print(f"  File size: {size_kb:.2f} KB")
+    if llms_full_file:
+        print(f"✓ llms-full.txt generated successfully")
+        size_mb = os.path.getsize(llms_full_file) / (1024 * 1024)
+        print(f"  File size: {size_mb:.2f} MB")
+    medium_file = tier_file(llms_full_file or llms_file, 'medium')
+    if tier_sections is not None:
+        header = io.StringIO()
+        write_llms_full_header(header, project_name, base_url, version, description, tier="Medium")
+        kept, tokens = write_budget_tier(llms_full_file, medium_file, header.getvalue(),
+                                         tier_sections, max_tokens, counter)
+        compress_file(medium_file, compress)
+        remove_compressed(medium_file, keep=compress)
+        print(f"✓ {medium_file.name} generated: {kept} of {len(tier_sections)} sections, "
+              f"{counter.format(tokens)} of {max_tokens:,} tokens")
+    else:
+        # A tier left by an earlier run would be served next to newer outputs
+        try:
+            os.remove(medium_file)
+        except OSError:
+            pass
+        remove_compressed(medium_file)
+        if max_tokens:
+            print("  ⚠ --max-tokens needs llms-full.txt; llms-medium.txt was not generated")
+    if compress:
+        outputs = (llms_file, llms_full_file, medium_file if tier_sections is not None else None)
+        names = [f"{Path(output).name}{COMPRESSION_SUFFIXES[codec]}"
+                 for output in outputs if output for codec in compress]
+        print(f"✓ Compressed copies: {', '.join(names)}")
+    if shards is not None:
+        print(f"✓ Split into {len(shards)} shards, listed in {shard_manifest_file(llms_full_file)}")
+
+
+def generate_llms_txt(md_files, root_path, output_file, project_name, base_url=None, version=None, description=None):
+    """Generate concise llms.txt index file."""
+    generate_outputs(md_files, root_path, output_file, None, project_name, base_url, version, description)
+
+
+def generate_llms_full_txt(md_files, root_path, output_file, project_name, base_url=None, version=None, description=None):
+    """Generate complete llms-full.txt with all documentation."""
+    generate_outputs(md_files, root_path, None, output_file, project_name, base_url, version, description)
+
+
+def lookup_project(args, owner, repo, metadata_cache=None):
+    """Work out the project name, base URL and description of a job."""
+    # Fetch GitHub metadata if not provided
+    if args.name and args.base_url and args.description:
+        github_info = {'homepage': None, 'description': None, 'name': repo}
+    else:
+        github_info = get_github_about(
+            owner, repo, metadata_cache,
+            cache_dir=args.cache_dir if args.metadata_ttl > 0 else None,
+            ttl=args.metadata_ttl,
+            token=args.github_token,
+            offline=args.offline
+        )
+    
+    return {
+        # Set project name
+        'name': args.name or github_info['name'] or repo,
+        # Set base URL
+        'base_url': args.base_url or github_info['homepage'],
+        # Set description
+        'description': args.description or github_info['description']
+    }
 
 
-def extract_repo_info(repo_url):
-    """Extract owner and repo name from GitHub URL."""
-    # Handle both git and https URLs
-    patterns = [
-        r'github\.com[:/]([^/]+)/([^/.]+)',
-        r'([^/]+)/([^/.]+?)(?:\.git)?$'
-    ]
+def start_project_lookup(args, metadata_cache=None):
+    """Parse the repository URL and look the project up in the background.
     
-    for pattern in patterns:
-        match = re.search(pattern, repo_url)
-        if match:
-            owner = match.group(1)
-            repo = match.group(2).replace('.git', '')
-            return owner, repo
+    The GitHub API round-trip then overlaps with cloning. Returns a future of the
+    project record, or None if the URL cannot be parsed.
+    """
+    # Extract repo info
+    owner, repo = extract_repo_info(args.repo_url)
+    if not owner or not repo:
+        print(f"✗ Could not parse repository URL: {args.repo_url}")
+        return None
     
-    return None, None
+    print(f"Repository: {owner}/{repo}")
+    
+    executor = ThreadPoolExecutor(max_workers=1)
+    future = executor.submit(lookup_project, args, owner, repo, metadata_cache)
+    executor.shutdown(wait=False)
+    return future
 
 
-def fetch_github_about(owner, repo):
-    """Fetch the About/Description from GitHub repository."""
-    try:
-        import urllib.request
-        api_url = f"https://api.github.com/repos/{owner}/{repo}"
-        
-        req = urllib.request.Request(api_url)
-        req.add_header('User-Agent', 'llms-txt-generator')
-        
-        with urllib.request.urlopen(req, timeout=10) as response:
-            data = json.loads(response.read().decode())
-            homepage = data.get('homepage', '').strip()
-            description = data.get('description', '').strip()
-            
-            return {
-                'homepage': homepage if homepage else None,
-                'description': description if description else None,
-                'name': data.get('name', repo)
-            }
-    except Exception as e:
-        print(f"  ⚠ Could not fetch GitHub metadata: {e}")
-        return {'homepage': None, 'description': None, 'name': repo}
+def print_project(project):
+    """Print the resolved project information."""
+    print(f"Project: {project['name']}")
+    if project['base_url']:
+        print(f"Base URL: {project['base_url']}")
+    if project['description']:
+        print(f"Description: {project['description']}")
+    print()
 
 
-def clone_repo(repo_url, target_dir, branch="main"):
-    """Clone the GitHub repository."""
-    print(f"Cloning repository from {repo_url}...")
-    print(f"Branch: {branch}")
+def job_output_files(args):
+    """Return the llms.txt, llms-full.txt and manifest paths of a job, None for those not produced."""
+    # Setup paths
+    output_dir = Path(args.output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    
+    # Generate output filenames
+    version_suffix = f"-{args.version}" if args.version else ""
+    llms_file = None if args.full_only else output_dir / f"llms{version_suffix}.txt"
+    llms_full_file = None if args.index_only else output_dir / f"llms-full{version_suffix}.txt"
+    manifest_file = output_dir / f".llms-manifest{version_suffix}.json"
+    if args.no_incremental:
+        # The rebuilt llms-full.txt no longer matches the offsets of an old manifest
+        try:
+            os.remove(manifest_file)
+        except OSError:
+            pass
+        manifest_file = None
+    return llms_file, llms_full_file, manifest_file
+
+
+def job_progress(args, total, output_file):
+    """Create the ProgressReporter of a job from its command line options."""
+    return ProgressReporter(
+        total, Path(output_file).name,
+        verbosity=0 if args.quiet else 2 if args.verbose else 1,
+        json_stream=sys.stderr if args.progress_json else None,
+        # Concurrent jobs cannot share one status line
+        live=sys.stdout.isatty() and not (args.batch or args.branches),
+        job={'repo': args.repo_url, 'output': str(output_file)}
+    )
+
+
+def job_token_options(args):
+    """Return the token counting options of generate_outputs for a job."""
+    if not (args.token_counts or args.max_tokens):
+        return {}
+    return {
+        'counter': make_token_counter(args.tokenizer),
+        'token_counts': args.token_counts,
+        'max_tokens': args.max_tokens
+    }
+
+
+def generate_from_checkout(args, repo_dir, project):
+    """Generate the output files of one checked-out tree.
     
-    # First try to clone with specified branch
-    cmd = ["git", "clone", "--depth", "1", "--branch", branch, repo_url, target_dir]
-    result = run_command(cmd)
+    Returns the (llms_file, llms_full_file) pair, with None for a file that was
+    not requested, or None if there was nothing to generate.
+    """
+    llms_file, llms_full_file, manifest_file = job_output_files(args)
     
-    if result is None:
-        # If branch doesn't exist, try master
-        print(f"  ⚠ Branch '{branch}' not found, trying 'master'...")
-        cmd = ["git", "clone", "--depth", "1", "--branch", "master", repo_url, target_dir]
-        result = run_command(cmd)
-        
-        if result is None:
-            # If still fails, try default branch
-            print(f"  ⚠ Trying default branch...")
-            cmd = ["git", "clone", "--depth", "1", repo_url, target_dir]
-            result = run_command(cmd)
-            
-            if result is None:
-                print(f"✗ Failed to clone repository")
-                return False
+    # Collect markdown files
+    md_files, root_path = collect_markdown_files(
+        repo_dir, args.root, args.include, args.exclude, not args.no_ignore_files
+    )
+    if not md_files:
+        print("✗ No markdown files found")
+        return None
     
-    print(f"✓ Repository cloned to {target_dir}")
-    return True
+    # Generate both files from a single pass over the documents
+    fingerprints = compute_fingerprints(repo_dir, md_files) if manifest_file else None
+    generate_outputs(
+        md_files, root_path, llms_file, llms_full_file,
+        project['name'], project['base_url'], args.version, project['description'], args.jobs,
+        manifest_file, fingerprints, use_mmap=args.mmap,
+        progress=job_progress(args, len(md_files), llms_full_file or llms_file),
+        shard_size=args.shard_size, compress=args.compress, **job_token_options(args)
+    )
+    return llms_file, llms_full_file
 
 
-def collect_markdown_files(docs_dir, root_folder="."):
-    """Collect all markdown files from the specified directory."""
-    docs_path = Path(docs_dir) / root_folder
+def generate_from_git(args, mirror_dir, ref, project):
+    """Generate the output files straight from the git objects of ref, without a checkout.
     
-    if not docs_path.exists():
-        print(f"✗ Directory not found: {docs_path}")
-        return []
+    Returns the same (llms_file, llms_full_file) pair as generate_from_checkout.
+    """
+    llms_file, llms_full_file, manifest_file = job_output_files(args)
     
-    # Collect all .md files recursively
-    md_files = []
-    for md_file in sorted(docs_path.rglob("*.md")):
-        # Skip common non-documentation files
-        if any(skip in md_file.parts for skip in ['.github', 'node_modules', '.git']):
-            continue
-        md_files.append(md_file)
+    md_files, root_path, blobs = list_git_markdown_files(
+        mirror_dir, ref, args.root, args.include, args.exclude, not args.no_ignore_files
+    )
+    if not md_files:
+        print("✗ No markdown files found")
+        return None
     
-    print(f"✓ Found {len(md_files)} markdown files in {root_folder}")
-    return md_files, docs_path
+    with mirror_lock(mirror_dir):
+        prefetch_blobs(mirror_dir, ref, blobs.values())
+    
+    # Blob ids double as fingerprints for the incremental manifest
+    with GitBlobReader(mirror_dir) as reader:
+        generate_outputs(
+            md_files, root_path, llms_file, llms_full_file,
+            project['name'], project['base_url'], args.version, project['description'], args.jobs,
+            manifest_file, blobs, lambda md_file: reader.read(blobs[md_file]),
+            progress=job_progress(args, len(md_files), llms_full_file or llms_file),
+            shard_size=args.shard_size, compress=args.compress, **job_token_options(args)
+        )
+    return llms_file, llms_full_file
 
 
-def extract_first_paragraph(content):
-    """Extract the first meaningful paragraph from markdown content."""
-    lines = content.strip().split('\n')
-    paragraph = []
+def run_git_job(args, work_root=None, metadata_cache=None, evict=True):
+    """Generate one repository's files from a blobless mirror, reading only markdown blobs."""
+    project_future = start_project_lookup(args, metadata_cache)
+    if project_future is None:
+        return False
     
-    for line in lines:
-        line = line.strip()
-        # Skip title lines, empty lines, and special markers
-        if line.startswith('#') or not line or line.startswith('---') or line.startswith('<!--'):
-            continue
+    with work_directory(args, "docs-repo-", work_root) as work_dir, ExitStack() as stack:
+        # Without the persistent cache the mirror lives only for this run
+        cache_dir = work_dir if args.no_cache else args.cache_dir
+        mirror_dir = get_mirror_dir(cache_dir, args.repo_url)
+        # Blobs are streamed from the mirror until generation is done
+        stack.enter_context(mirror_in_use(mirror_dir))
         
-        # Start collecting paragraph
-        if line and not paragraph:
-            paragraph.append(line)
-        elif line and paragraph:
-            paragraph.append(line)
-        elif not line and paragraph:
-            break  # End of first paragraph
-    
-    result = ' '.join(paragraph)
-    # Limit length
-    if len(result) > 300:
-        result = result[:297] + "..."
-    return result if result else "Documentation section."
-
-
-def extract_title(content):
-    """Extract the first H1 title from the markdown."""
-    lines = content.split('\n')
-    for line in lines:
-        line = line.strip()
-        if line.startswith('# '):
-            return line[2:].strip()
-    return None
+        print(f"Fetching {args.repo_url} without blobs...")
+        print(f"Branch: {args.branch or 'main'}")
+        with mirror_lock(mirror_dir):
+            ref = fetch_ref(args.repo_url, mirror_dir, args.branch, blobless=True)
+            if ref is not None:
+                touch_mirror(mirror_dir)
+        if ref is None:
+            print(f"✗ Failed to fetch repository")
+            return False
+        if not args.no_cache and evict:
+            evict_mirrors(cache_dir, args.cache_max_size, keep=mirror_dir)
+        
+        print()
+        project = project_future.result()
+        print_project(project)
+        
+        outputs = generate_from_git(args, mirror_dir, ref, project)
+    if outputs is None:
+        return False
+    
+    print(f"\n✅ Done! Generated files:")
+    print_generated_files(*outputs)
+    return True
 
 
-def get_relative_path(file_path, root_path):
-    """Get the relative path from root for URL generation."""
-    try:
-        rel_path = file_path.relative_to(root_path)
-        # Convert to URL path (forward slashes, no extension)
-        url_path = str(rel_path.with_suffix('')).replace(os.sep, '/')
-        return url_path
-    except ValueError:
-        return file_path.stem
+def print_generated_files(llms_file, llms_full_file):
+    """Print the summary line of each generated file."""
+    if llms_file and llms_file.exists():
+        size_kb = llms_file.stat().st_size / 1024
+        print(f"   • {llms_file} ({size_kb:.1f} KB) - index")
+    if llms_full_file and llms_full_file.exists():
+        size_mb = llms_full_file.stat().st_size / (1024 * 1024)
+        print(f"   • {llms_full_file} ({size_mb:.1f} MB) - complete documentation")
+        medium_file = tier_file(llms_full_file, 'medium')
+        if medium_file.exists():
+            size_kb = medium_file.stat().st_size / 1024
+            print(f"   • {medium_file} ({size_kb:.1f} KB) - token-budgeted documentation")
+        if shard_manifest_file(llms_full_file).exists():
+            print(f"   • {shard_manifest_file(llms_full_file)} - shards of the complete documentation")
 
 
-def generate_llms_txt(md_files, root_path, output_file, project_name, base_url=None, version=None, description=None):
-    """Generate concise llms.txt index file."""
-    print(f"\nGenerating {output_file} (index)...")
+def run_job(args, work_root=None, metadata_cache=None, evict=True):
+    """Clone one repository and generate its llms.txt files. Returns True on success.
     
-    with open(output_file, 'w', encoding='utf-8') as out:
-        # Write header
-        title = f"{project_name} Documentation"
-        if version:
-            title += f" - {version}"
-        
-        out.write(f"# {title}\n\n")
-        
-        if description:
-            out.write(f"> {description}\n\n")
-        
-        if base_url:
-            out.write(f"Website: {base_url}\n")
-        
-        out.write("\n")
-        
-        # Write index of all documents
-        out.write("## Documentation Index\n\n")
+    The checkout lives in work_root, or in the directory given by work_directory.
+    """
+    # GitHub metadata is fetched while the stale directory is removed and the repository cloned
+    project_future = start_project_lookup(args, metadata_cache)
+    if project_future is None:
+        return False
+    
+    cache_dir = None if args.no_cache else args.cache_dir
+    with work_directory(args, "docs-repo-", work_root) as work_dir, ExitStack() as stack:
+        repo_dir = str(work_dir / "repo")
+        if cache_dir:
+            # The checkout is a worktree of the mirror until generation is done
+            stack.enter_context(mirror_in_use(get_mirror_dir(cache_dir, args.repo_url)))
         
-        # Process each markdown file to create index
-        file_info = []
-        for md_file in md_files:
-            try:
-                with open(md_file, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                
-                url_path = get_relative_path(md_file, root_path)
-                title = extract_title(content) or url_path.replace('/', ' > ').replace('-', ' ').title()
-                desc = extract_first_paragraph(content)
-                
-                # Generate full URL if base_url provided
-                if base_url:
-                    full_url = f"{base_url.rstrip('/')}/{url_path}"
-                else:
-                    full_url = url_path
-                
-                file_info.append({
-                    'path': url_path,
-                    'title': title,
-                    'description': desc,
-                    'url': full_url
-                })
-            except Exception as e:
-                print(f"  ✗ Error processing {md_file.name}: {e}")
-                continue
+        # Clone repository
+        if not clone_repo(args.repo_url, repo_dir, args.branch, cache_dir, job_sparse_args(args)):
+            return False
+        if cache_dir and evict:
+            evict_mirrors(cache_dir, args.cache_max_size, keep=get_mirror_dir(cache_dir, args.repo_url))
         
-        # Write the index
-        for info in file_info:
-            out.write(f"### [{info['title']}]({info['url']})\n\n")
-            out.write(f"{info['description']}\n\n")
+        print()
+        project = project_future.result()
+        print_project(project)
         
-        out.write("\n---\n\n")
-        out.write("## Notes\n\n")
-        out.write("- For complete documentation content, see `llms-full.txt`\n")
-        out.write(f"- Total sections: {len(file_info)}\n")
+        outputs = generate_from_checkout(args, repo_dir, project)
     
-    print(f"✓ llms.txt generated successfully")
-    size_kb = os.path.getsize(output_file) / 1024
-    print(f"  File size: {size_kb:.2f} KB")
+    # Drop the worktree registration of the removed checkout
+    if cache_dir and not args.keep_repo:
+        run_command(["git", "-C", str(get_mirror_dir(cache_dir, args.repo_url)), "worktree", "prune"])
+    if outputs is None:
+        return False
+    
+    print(f"\n✅ Done! Generated files:")
+    print_generated_files(*outputs)
+    return True
 
 
-def generate_llms_full_txt(md_files, root_path, output_file, project_name, base_url=None, version=None, description=None):
-    """Generate complete llms-full.txt with all documentation."""
-    print(f"\nGenerating {output_file} (full documentation)...")
+def run_branches(args, work_root=None, metadata_cache=None, evict=True):
+    """Generate one versioned output per branch of --branches from a single object store.
     
-    with open(output_file, 'w', encoding='utf-8') as out:
-        # Write header
-        title = f"{project_name} Documentation - Complete"
-        if version:
-            title += f" - {version}"
-        
-        out.write(f"# {title}\n\n")
-        
-        if description:
-            out.write(f"> {description}\n\n")
-        
-        if base_url:
-            out.write(f"Website: {base_url}\n")
-        
-        out.write("\n---\n\n")
-        
-        # Process each markdown file
-        for idx, md_file in enumerate(md_files, 1):
-            print(f"  [{idx}/{len(md_files)}] Processing {md_file.name}...")
-            
-            try:
-                with open(md_file, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                
-                url_path = get_relative_path(md_file, root_path)
-                title = extract_title(content) or url_path.replace('/', ' > ').replace('-', ' ').title()
-                
-                # Generate full URL if base_url provided
-                if base_url:
-                    full_url = f"{base_url.rstrip('/')}/{url_path}"
-                else:
-                    full_url = url_path
-                
-                # Write section header
-                out.write(f"## {title}\n\n")
-                out.write(f"**Path:** `{url_path}.md`  \n")
-                if base_url:
-                    out.write(f"**URL:** {full_url}\n\n")
-                else:
-                    out.write(f"**File:** `{url_path}.md`\n\n")
-                out.write(content)
-                out.write("\n\n")
-                out.write("---\n\n")
-                
-            except Exception as e:
-                print(f"  ✗ Error reading {md_file.name}: {e}")
+    All branches are fetched into the same mirror with one fetch, checked out as
+    worktrees and generated concurrently. Returns True if every branch succeeded.
+    """
+    branches = [branch.strip() for branch in args.branches.split(',') if branch.strip()]
+    project_future = start_project_lookup(args, metadata_cache)
+    if project_future is None or not branches:
+        return False
+    
+    with work_directory(args, "docs-repo-branches-", work_root) as work_dir:
+        cache_dir = work_dir if args.no_cache else args.cache_dir
+        # The worktrees and blobs of every branch come from the mirror until all are done
+        with mirror_in_use(get_mirror_dir(cache_dir, args.repo_url)):
+            results = generate_branches(args, branches, work_dir, project_future, evict)
+    if not args.no_cache and not args.keep_repo:
+        run_command(["git", "-C", str(get_mirror_dir(args.cache_dir, args.repo_url)), "worktree", "prune"])
+    
+    print(f"\n✅ Done! Generated files:")
+    for outputs in results.values():
+        if outputs:
+            print_generated_files(*outputs)
+    return len(branches) == len([outputs for outputs in results.values() if outputs])
+
+
+def generate_branches(args, branches, work_dir, project_future, evict=True):
+    """Fetch branches into one mirror and generate each of them concurrently.
+    
+    Returns a dict mapping each branch that could be checked out to its outputs.
+    """
+    # Without the persistent cache the shared object store lives only for this run
+    cache_dir = work_dir if args.no_cache else args.cache_dir
+    mirror_dir = get_mirror_dir(cache_dir, args.repo_url)
+    
+    print(f"Fetching branches {', '.join(branches)} from {args.repo_url}...")
+    sparse_args = job_sparse_args(args)
+    worktrees = {}
+    with mirror_lock(mirror_dir):
+        blobless = args.from_git or bool(sparse_args)
+        refs = fetch_branches(args.repo_url, mirror_dir, branches, blobless=blobless)
+        run_command(["git", "-C", str(mirror_dir), "worktree", "prune"])
+        for branch in branches:
+            if branch not in refs:
+                print(f"  ✗ Branch '{branch}' not found")
                 continue
+            if args.from_git:
+                # Generated straight from the branch's tree, no worktree needed
+                worktrees[branch] = refs[branch]
+                continue
+            worktree = os.path.join(work_dir, branch.replace('/', '_'))
+            if not add_worktree(mirror_dir, worktree, refs[branch], sparse_args):
+                print(f"  ✗ Could not check out branch '{branch}'")
+                continue
+            worktrees[branch] = worktree
+        touch_mirror(mirror_dir)
+    if not args.no_cache and evict:
+        evict_mirrors(cache_dir, args.cache_max_size, keep=mirror_dir)
+    
+    print()
+    project = project_future.result()
+    print_project(project)
+    
+    def generate(branch):
+        branch_args = argparse.Namespace(**vars(args))
+        branch_args.branch = branch
+        branch_args.version = branch
+        try:
+            if args.from_git:
+                return generate_from_git(branch_args, mirror_dir, worktrees[branch], project)
+            return generate_from_checkout(branch_args, worktrees[branch], project)
+        except Exception as e:
+            print(f"✗ Branch '{branch}' failed: {e}")
+            return None
+    
+    with ThreadPoolExecutor(max_workers=max(1, args.concurrency)) as executor:
+        return dict(zip(worktrees, executor.map(generate, worktrees)))
+
+
+BATCH_JOB_KEYS = (
+    'repo_url', 'branch', 'branches', 'root', 'name', 'version', 'base_url',
+    'description', 'output_dir', 'index_only', 'full_only', 'include', 'exclude',
+    'no_ignore_files', 'mmap', 'shard_size', 'token_counts', 'max_tokens', 'tokenizer', 'compress'
+)
+
+
+def load_batch_file(batch_file):
+    """Load the list of jobs from a JSON or YAML batch file."""
+    with open(batch_file, 'r', encoding='utf-8') as f:
+        text = f.read()
+    
+    if str(batch_file).endswith(('.yaml', '.yml')):
+        if yaml is None:
+            raise ValueError("PyYAML is required for YAML batch files (pip install pyyaml)")
+        data = yaml.safe_load(text)
+    else:
+        data = json.loads(text)
+    
+    if isinstance(data, dict):
+        data = data.get('jobs')
+    if not isinstance(data, list):
+        raise ValueError("batch file must contain a list of jobs (or a 'jobs' list)")
     
-    print(f"✓ llms-full.txt generated successfully")
-    size_mb = os.path.getsize(output_file) / (1024 * 1024)
-    print(f"  File size: {size_mb:.2f} MB")
+    jobs = []
+    for idx, entry in enumerate(data, 1):
+        if not isinstance(entry, dict):
+            raise ValueError(f"job #{idx} is not a mapping")
+        job = {key.replace('-', '_'): value for key, value in entry.items()}
+        unknown = set(job) - set(BATCH_JOB_KEYS)
+        if unknown:
+            raise ValueError(f"job #{idx} has unknown keys: {', '.join(sorted(unknown))}")
+        if not job.get('repo_url'):
+            raise ValueError(f"job #{idx} is missing repo_url")
+        if job.get('index_only') and job.get('full_only'):
+            raise ValueError(f"job #{idx} sets both index_only and full_only")
+        try:
+            if isinstance(job.get('shard_size'), str):
+                job['shard_size'] = parse_size(job['shard_size'])
+            for key in ('include', 'exclude'):
+                patterns = job.get(key)
+                if isinstance(patterns, str):
+                    job[key] = [patterns]
+                elif patterns is not None and not (
+                    isinstance(patterns, list) and all(isinstance(p, str) for p in patterns)
+                ):
+                    raise ValueError(f"job #{idx}: {key} must be a glob or a list of globs")
+            if isinstance(job.get('branches'), list):
+                job['branches'] = ','.join(str(branch) for branch in job['branches'])
+            if 'compress' in job:
+                compress = job['compress'] or ()
+                job['compress'] = parse_codecs(compress if isinstance(compress, str) else ','.join(compress))
+        except argparse.ArgumentTypeError as e:
+            raise ValueError(f"job #{idx}: {e}")
+        jobs.append(job)
+    return jobs
+
+
+def run_batch(args):
+    """Run every job of the batch file concurrently in this process. Returns True if all succeeded."""
+    try:
+        jobs = load_batch_file(args.batch)
+    except (OSError, ValueError) as e:
+        print(f"✗ Could not load batch file {args.batch}: {e}")
+        return False
+    
+    print(f"Running {len(jobs)} jobs with concurrency {args.concurrency}")
+    metadata_cache = {}
+    
+    def run(idx, job):
+        job_args = argparse.Namespace(**vars(args))
+        for key, value in job.items():
+            setattr(job_args, key, value)
+        if job.get('index_only') or job.get('full_only'):
+            # The job's own choice replaces --index-only/--full-only from the command line
+            job_args.index_only = bool(job.get('index_only'))
+            job_args.full_only = bool(job.get('full_only'))
+        job_root = batch_root / f"job-{idx}"
+        try:
+            if job_args.branches:
+                return run_branches(job_args, job_root, metadata_cache, evict=False)
+            if job_args.from_git:
+                return run_git_job(job_args, job_root, metadata_cache, evict=False)
+            return run_job(job_args, job_root, metadata_cache, evict=False)
+        except Exception as e:
+            print(f"✗ Job {job['repo_url']} failed: {e}")
+            return False
+    
+    with work_directory(args, "docs-repo-batch-") as batch_root:
+        with ThreadPoolExecutor(max_workers=max(1, args.concurrency)) as executor:
+            results = list(executor.map(run, range(1, len(jobs) + 1), jobs))
+    
+    # Evict only once every job is done so no mirror is removed while in use
+    if not args.no_cache:
+        evict_mirrors(args.cache_dir, args.cache_max_size)
+    
+    failed = [job['repo_url'] for job, ok in zip(jobs, results) if not ok]
+    print(f"\nBatch finished: {len(jobs) - len(failed)}/{len(jobs)} jobs succeeded")
+    for repo_url in failed:
+        print(f"   ✗ {repo_url}")
+    return not failed
 
 
 def main():
@@ -314,6 +2627,7 @@ Examples:
     # Required arguments
     parser.add_argument(
         "repo_url",
+        nargs="?",
         help="GitHub repository URL (e.g., https://github.com/owner/repo)"
     )
     
@@ -323,10 +2637,31 @@ Examples:
         default=".",
         help="Root folder within repo containing markdown files (default: repository root)"
     )
+    parser.add_argument(
+        "--include",
+        action="append",
+        metavar="GLOB",
+        help="Only collect files matching this glob, relative to --root (repeatable, default: *.md)"
+    )
+    parser.add_argument(
+        "--exclude",
+        action="append",
+        metavar="GLOB",
+        help="Skip files and directories matching this glob, relative to --root (repeatable)"
+    )
+    parser.add_argument(
+        "--no-ignore-files",
+        action="store_true",
+        help="Do not honour .gitignore and .llmsignore files when collecting markdown files"
+    )
     parser.add_argument(
         "--branch",
-        default="main",
-        help="Branch to clone (default: main)"
+        help="Branch or tag to clone (default: main, falling back to master and then the default branch)"
+    )
+    parser.add_argument(
+        "--branches",
+        help="Comma-separated branches (or tags) to generate from one shared clone, "
+             "each versioned by its branch name (e.g., 10.x,11.x,12.x)"
     )
     parser.add_argument(
         "--name",
@@ -354,6 +2689,11 @@ Examples:
         action="store_true",
         help="Keep the cloned repository after generation"
     )
+    parser.add_argument(
+        "--work-dir",
+        help="Directory to clone into, locked while in use; must be missing, empty or left by an earlier run "
+             "(default: a unique temporary directory per run)"
+    )
     parser.add_argument(
         "--full-only",
         action="store_true",
@@ -364,88 +2704,156 @@ Examples:
         action="store_true",
         help="Generate only llms.txt (index)"
     )
+    parser.add_argument(
+        "--shard-size",
+        type=parse_size,
+        help="Also split llms-full.txt at document boundaries into shards of at most this size: "
+             "bytes with an optional K/M/G suffix, or tokens with a t suffix (e.g. 50M, 200kt)"
+    )
+    parser.add_argument(
+        "--compress",
+        type=parse_codecs,
+        default=(),
+        help="Also write compressed copies of llms.txt and llms-full.txt during generation: comma-separated "
+             "codecs out of gzip, zstd (requires zstandard) and brotli (requires brotli)"
+    )
+    parser.add_argument(
+        "--token-counts",
+        action="store_true",
+        help="Annotate every llms.txt entry with the number of tokens of its document"
+    )
+    parser.add_argument(
+        "--max-tokens",
+        type=int,
+        help="Also write llms-medium.txt, holding the highest-priority sections that fit in this many tokens"
+    )
+    parser.add_argument(
+        "--tokenizer",
+        default="approx",
+        help="How tokens are counted: approx (about 4 bytes per token, default) or tiktoken[:ENCODING] "
+             "(exact, requires tiktoken; default encoding cl100k_base)"
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Number of worker threads used to read and parse markdown files (default: 1)"
+    )
+    parser.add_argument(
+        "--mmap",
+        action="store_true",
+        help="Read markdown files through memory maps instead of copying them into Python strings"
+    )
+    parser.add_argument(
+        "--batch",
+        metavar="FILE",
+        help="Run every job listed in a JSON or YAML batch file in one process"
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=4,
+        help="Maximum number of batch jobs or --branches versions run at the same time (default: 4)"
+    )
+    verbosity = parser.add_mutually_exclusive_group()
+    verbosity.add_argument(
+        "--quiet", "-q",
+        action="store_true",
+        help="Do not report progress while processing files"
+    )
+    verbosity.add_argument(
+        "--verbose", "-v",
+        action="store_true",
+        help="Print a line for every processed file"
+    )
+    parser.add_argument(
+        "--progress-json",
+        action="store_true",
+        help="Write machine-readable progress events to stderr as JSON lines"
+    )
+    parser.add_argument(
+        "--no-incremental",
+        action="store_true",
+        help="Rebuild every file instead of reusing unchanged files recorded in the manifest"
+    )
+    parser.add_argument(
+        "--sparse",
+        action="store_true",
+        help="Use a blobless partial clone and check out only the --root folder"
+    )
+    parser.add_argument(
+        "--sparse-markdown",
+        action="store_true",
+        help="Like --sparse, but check out only the markdown files below --root"
+    )
+    parser.add_argument(
+        "--from-git",
+        action="store_true",
+        help="Read markdown straight from git objects of a blobless clone instead of checking files out"
+    )
+    parser.add_argument(
+        "--metadata-ttl",
+        type=int,
+        default=86400,
+        help="Seconds GitHub metadata is served from the cache before being revalidated; 0 disables the cache (default: 86400)"
+    )
+    parser.add_argument(
+        "--github-token",
+        default=os.environ.get('GITHUB_TOKEN'),
+        help="GitHub token used for API requests (default: $GITHUB_TOKEN)"
+    )
+    parser.add_argument(
+        "--offline",
+        action="store_true",
+        help="Never call the GitHub API; use cached metadata only"
+    )
+    parser.add_argument(
+        "--cache-dir",
+        default=default_cache_dir(),
+        help="Directory for persistent repository mirrors (default: ~/.cache/llms-txt-generator)"
+    )
+    parser.add_argument(
+        "--cache-max-size",
+        type=int,
+        default=2048,
+        help="Maximum size of the mirror cache in MB; least recently used mirrors are evicted (default: 2048)"
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Do a fresh shallow clone instead of using the mirror cache"
+    )
     
     args = parser.parse_args()
+    if args.token_counts or args.max_tokens:
+        try:
+            make_token_counter(args.tokenizer)
+        except ValueError as e:
+            parser.error(str(e))
     
-    # Extract repo info
-    owner, repo = extract_repo_info(args.repo_url)
-    if not owner or not repo:
-        print(f"✗ Could not parse repository URL: {args.repo_url}")
-        sys.exit(1)
-    
-    print(f"Repository: {owner}/{repo}")
-    
-    # Fetch GitHub metadata if not provided
-    github_info = fetch_github_about(owner, repo)
-    
-    # Set project name
-    project_name = args.name or github_info['name'] or repo
-    
-    # Set base URL
-    base_url = args.base_url or github_info['homepage']
-    
-    # Set description
-    description = args.description or github_info['description']
-    
-    print(f"Project: {project_name}")
-    if base_url:
-        print(f"Base URL: {base_url}")
-    if description:
-        print(f"Description: {description}")
-    print()
-    
-    # Setup paths
-    repo_dir = "/tmp/docs-repo"
-    output_dir = Path(args.output_dir)
-    output_dir.mkdir(parents=True, exist_ok=True)
-    
-    # Generate output filenames
-    version_suffix = f"-{args.version}" if args.version else ""
-    llms_file = output_dir / f"llms{version_suffix}.txt"
-    llms_full_file = output_dir / f"llms-full{version_suffix}.txt"
-    
-    # Clean up existing repo if present
-    if os.path.exists(repo_dir):
-        print(f"Removing existing directory: {repo_dir}")
-        subprocess.run(["rm", "-rf", repo_dir], check=True)
+    if args.index_only and args.full_only:
+        parser.error("--index-only and --full-only cannot be combined")
+    if args.work_dir:
+        error = check_work_dir(args.work_dir)
+        if error:
+            parser.error(error)
     
-    # Clone repository
-    if not clone_repo(args.repo_url, repo_dir, args.branch):
-        sys.exit(1)
+    # Finish deleting work directories of runs that were interrupted
+    sweep_trash(tempfile.gettempdir())
     
-    print()
+    if args.batch:
+        success = run_batch(args)
+    elif args.repo_url and args.branches:
+        success = run_branches(args)
+    elif args.repo_url and args.from_git:
+        success = run_git_job(args)
+    elif args.repo_url:
+        success = run_job(args)
+    else:
+        parser.error("repo_url is required unless --batch is given")
     
-    # Collect markdown files
-    md_files, root_path = collect_markdown_files(repo_dir, args.root)
-    if not md_files:
-        print("✗ No markdown files found")
+    if not success:
         sys.exit(1)
-    
-    # Generate files based on options
-    if not args.full_only:
-        generate_llms_txt(
-            md_files, root_path, llms_file, 
-            project_name, base_url, args.version, description
-        )
-    
-    if not args.index_only:
-        generate_llms_full_txt(
-            md_files, root_path, llms_full_file,
-            project_name, base_url, args.version, description
-        )
-    
-    # Cleanup
-    if not args.keep_repo:
-        print(f"\nCleaning up: removing {repo_dir}")
-        subprocess.run(["rm", "-rf", repo_dir], check=True)
-    
-    print(f"\n✅ Done! Generated files:")
-    if not args.full_only and llms_file.exists():
-        size_kb = llms_file.stat().st_size / 1024
-        print(f"   • {llms_file} ({size_kb:.1f} KB) - index")
-    if not args.index_only and llms_full_file.exists():
-        size_mb = llms_full_file.stat().st_size / (1024 * 1024)
-        print(f"   • {llms_full_file} ({size_mb:.1f} MB) - complete documentation")
 
 
 if __name__ == "__main__":